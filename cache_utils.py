@@ -0,0 +1,426 @@
+# 실행 간 유지되는 캐시 도구 모음
+import os
+import re
+import json
+import time
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+
+class ContentStore:
+    """내용 해시(SHA-256)를 키로 이미지를 한 번만 저장하는 저장소
+
+    실행 폴더에는 복사본 대신 저장소 파일의 하드링크를 만듭니다.
+    """
+
+    def __init__(self, store_folder):
+        self.store_folder = store_folder
+        self._lock = threading.Lock()
+        self.stats = {'stored': 0, 'deduplicated': 0, 'bytes_saved': 0, 'linked': 0, 'copied': 0}
+        os.makedirs(store_folder, exist_ok=True)
+
+    def blob_path(self, digest):
+        """해시에 해당하는 저장소 파일 경로"""
+        return os.path.join(self.store_folder, digest[:2], digest)
+
+    def has(self, digest):
+        """저장소에 해당 내용이 있는지 확인"""
+        return bool(digest) and os.path.exists(self.blob_path(digest))
+
+    def add_file(self, src_path, digest):
+        """파일을 저장소로 이동 (이미 있는 내용이면 원본만 삭제)"""
+        blob_path = self.blob_path(digest)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+
+        with self._lock:
+            if os.path.exists(blob_path):
+                size = os.path.getsize(src_path)
+                os.remove(src_path)
+                self.stats['deduplicated'] += 1
+                self.stats['bytes_saved'] += size
+            else:
+                os.replace(src_path, blob_path)
+                self.stats['stored'] += 1
+        return blob_path
+
+    def link_into(self, digest, filepath):
+        """저장소 파일을 실행 폴더에 하드링크 (지원하지 않으면 복사)"""
+        blob_path = self.blob_path(digest)
+        tmp_path = f"{filepath}.{threading.get_ident()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        try:
+            os.link(blob_path, tmp_path)
+            outcome = 'linked'
+        except OSError:
+            # 다른 드라이브이거나 하드링크를 지원하지 않는 파일 시스템
+            shutil.copyfile(blob_path, tmp_path)
+            outcome = 'copied'
+
+        os.replace(tmp_path, filepath)
+        with self._lock:
+            self.stats[outcome] += 1
+        return os.path.getsize(filepath)
+
+class HttpCache:
+    """URL별 ETag/Last-Modified를 저장하는 디스크 HTTP 캐시
+
+    본문은 ContentStore에 보관하고 URL별로 내용 해시만 기록하며,
+    다음 실행에서 조건부 요청으로 재검증합니다.
+    """
+
+    INDEX_FILE = "http_cache.json"
+
+    def __init__(self, cache_folder, content_store):
+        self.cache_folder = cache_folder
+        self.content_store = content_store
+        self.index_path = os.path.join(cache_folder, self.INDEX_FILE)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.stats = {'fresh_hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0}
+
+        os.makedirs(cache_folder, exist_ok=True)
+        self.entries = self.load_index()
+
+    def load_index(self):
+        """캐시 색인 로드"""
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"HTTP 캐시 색인 로드 오류: {e}, 빈 캐시로 시작")
+            return {}
+
+    def save_index(self):
+        """캐시 색인 저장 (임시 파일 기록 후 교체)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self.entries)
+            self._dirty = False
+
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, url):
+        """저장소에 본문이 남아 있는 캐시 항목 반환"""
+        with self._lock:
+            entry = self.entries.get(url)
+        if entry and self.content_store.has(entry.get('digest')):
+            return entry
+        return None
+
+    def is_fresh(self, entry):
+        """Cache-Control max-age 기간 안에 있는지 확인"""
+        return entry.get('fresh_until', 0) > time.time()
+
+    def conditional_headers(self, entry):
+        """재검증용 조건부 요청 헤더"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, digest, size, response_headers):
+        """저장소에 들어간 본문을 URL 캐시 항목으로 기록"""
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        max_age = parse_max_age(response_headers.get('Cache-Control', ''))
+        if not etag and not last_modified and not max_age:
+            return False
+
+        with self._lock:
+            self.entries[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'fresh_until': time.time() + max_age if max_age else 0,
+                'content_type': response_headers.get('Content-Type', ''),
+                'size': size,
+                'digest': digest
+            }
+            self.stats['stored'] += 1
+            self._dirty = True
+        return True
+
+    def refresh(self, url, response_headers):
+        """304 응답의 헤더로 캐시 항목 갱신"""
+        max_age = parse_max_age(response_headers.get('Cache-Control', ''))
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return
+            if response_headers.get('ETag'):
+                entry['etag'] = response_headers['ETag']
+            if response_headers.get('Last-Modified'):
+                entry['last_modified'] = response_headers['Last-Modified']
+            if max_age:
+                entry['fresh_until'] = time.time() + max_age
+            self._dirty = True
+
+    def materialize(self, entry, filepath):
+        """캐시 본문을 실행 폴더에 하드링크"""
+        return self.content_store.link_into(entry['digest'], filepath)
+
+    def record(self, outcome):
+        """캐시 사용 통계 기록 (fresh_hits, revalidated, misses)"""
+        with self._lock:
+            self.stats[outcome] += 1
+
+def parse_max_age(cache_control):
+    """Cache-Control 헤더에서 max-age(초) 추출"""
+    if not cache_control or 'no-cache' in cache_control or 'no-store' in cache_control:
+        return 0
+    match = re.search(r'max-age=(\d+)', cache_control)
+    return int(match.group(1)) if match else 0
+
+class CrawlState:
+    """실행 간 수집 상태(본 주문 ID, 이미지 URL, 저장 파일)를 기록하는 SQLite 저장소
+
+    증분 모드에서 이미 본 주문에 도달하면 페이지 탐색을 멈추고 새 URL만 다운로드하는 데 사용합니다.
+    한도 초과나 일시적 오류로 받지 못한 URL은 downloaded_at 없이 남겨 두어 다음 증분 실행에서 다시 받습니다.
+    추출과 다운로드가 서로 다른 스레드에서 실행되므로 연결은 잠금으로 보호합니다.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS orders (
+        order_id TEXT PRIMARY KEY,
+        first_seen TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS images (
+        url TEXT PRIMARY KEY,
+        filename TEXT,
+        folder TEXT,
+        sha256 TEXT,
+        size INTEGER,
+        first_seen TEXT NOT NULL,
+        downloaded_at TEXT
+    );
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    def has_seen_any_order(self, order_ids):
+        """주어진 주문 ID 중 이전 실행에서 본 것이 있는지 확인"""
+        order_ids = list(order_ids)
+        with self._lock:
+            for start in range(0, len(order_ids), 500):
+                batch = order_ids[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                row = self.conn.execute(
+                    f"SELECT 1 FROM orders WHERE order_id IN ({placeholders}) LIMIT 1", batch
+                ).fetchone()
+                if row:
+                    return True
+        return False
+
+    def mark_orders_seen(self, order_ids):
+        """주문 ID를 본 것으로 기록"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO orders (order_id, first_seen) VALUES (?, ?)",
+                [(order_id, now) for order_id in order_ids]
+            )
+            self.conn.commit()
+
+    def downloaded_urls(self):
+        """이전 실행에서 다운로드한 URL 집합"""
+        with self._lock:
+            return {
+                row[0] for row in self.conn.execute("SELECT url FROM images WHERE downloaded_at IS NOT NULL")
+            }
+
+    def pending_urls(self):
+        """이전 실행에서 받지 못하고 남겨 둔 URL 목록 (기록한 순서)"""
+        with self._lock:
+            return [
+                row[0] for row in self.conn.execute(
+                    "SELECT url FROM images WHERE downloaded_at IS NULL ORDER BY first_seen, rowid")
+            ]
+
+    def record_pending_urls(self, urls):
+        """다음 실행에서 다시 받을 URL 기록 (이미 받은 URL은 그대로 둠)"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO images (url, first_seen) VALUES (?, ?)",
+                [(url, now) for url in urls]
+            )
+
+    def forget_pending_urls(self, urls):
+        """다시 받아도 소용없는 URL을 남겨 둔 목록에서 제거"""
+        with self._lock:
+            self.conn.executemany(
+                "DELETE FROM images WHERE url = ? AND downloaded_at IS NULL",
+                [(url,) for url in urls]
+            )
+
+    def filter_new_urls(self, urls):
+        """아직 다운로드한 적 없는 URL만 순서대로 반환"""
+        downloaded = self.downloaded_urls()
+        return [url for url in urls if url not in downloaded]
+
+    def record_image(self, url, filename, folder, sha256, size):
+        """다운로드한 이미지와 저장 파일 기록"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.conn.execute(
+                """INSERT INTO images (url, filename, folder, sha256, size, first_seen, downloaded_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(url) DO UPDATE SET filename = excluded.filename, folder = excluded.folder,
+                       sha256 = excluded.sha256, size = excluded.size, downloaded_at = excluded.downloaded_at""",
+                (url, filename, folder, sha256, size, now, now)
+            )
+
+    def commit(self):
+        """보류 중인 기록 저장"""
+        with self._lock:
+            self.conn.commit()
+
+    def close(self):
+        """연결 종료"""
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+
+class SessionCookieStore:
+    """로그인 후 브라우저 쿠키를 저장해 다음 실행에서 재사용하는 파일 저장소
+
+    쿠키는 계정 인증 정보와 같으므로 소유자만 읽을 수 있게 저장합니다.
+    """
+
+    def __init__(self, path, max_age_hours=72):
+        self.path = path
+        self.max_age = max_age_hours * 3600
+
+    def load(self):
+        """만료되지 않은 저장 쿠키 목록 반환 (없거나 오래되었으면 빈 목록)"""
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"저장된 로그인 세션 로드 오류: {e}")
+            return []
+
+        now = time.time()
+        if now - data.get('saved_at', 0) > self.max_age:
+            return []
+        return [
+            cookie for cookie in data.get('cookies', [])
+            if not cookie.get('expiry') or cookie['expiry'] > now
+        ]
+
+    def save(self, cookies):
+        """쿠키 목록 저장 (임시 파일 기록 후 교체)"""
+        tmp_path = self.path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': time.time(), 'cookies': cookies}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """저장된 쿠키 삭제"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class SelectorCache:
+    """마지막으로 성공한 셀렉터·XPath·URL을 기억해 다음 실행에서 먼저 시도하게 하는 캐시
+
+    기억한 항목이 연속으로 max_failures번 실패하면 강등하여 원래 목록 순서로 돌아갑니다.
+    """
+
+    CACHE_FILE = "selector_cache.json"
+
+    def __init__(self, cache_folder, max_failures=2):
+        self.path = os.path.join(cache_folder, self.CACHE_FILE)
+        self.max_failures = max_failures
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.stats = {'hits': 0, 'misses': 0, 'demoted': 0}
+
+        os.makedirs(cache_folder, exist_ok=True)
+        self.entries = self.load()
+
+    def load(self):
+        """캐시 파일 로드"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"셀렉터 캐시 로드 오류: {e}, 빈 캐시로 시작")
+            return {}
+
+    def save(self):
+        """변경된 경우에만 캐시 파일 저장"""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self.entries)
+            self._dirty = False
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def order(self, key, candidates):
+        """기억한 항목을 맨 앞으로 옮긴 후보 목록"""
+        with self._lock:
+            winner = self.entries.get(key, {}).get('winner')
+        if winner in candidates:
+            return [winner] + [candidate for candidate in candidates if candidate != winner]
+        return list(candidates)
+
+    def record_success(self, key, value):
+        """성공한 항목 기록 (기억한 항목이면 적중 True, 아니면 교체 후 False)"""
+        with self._lock:
+            entry = self.entries.setdefault(key, {'winner': None, 'hits': 0, 'misses': 0, 'failures': 0})
+            hit = entry.get('winner') == value
+            if hit:
+                entry['hits'] += 1
+                self.stats['hits'] += 1
+            else:
+                entry['winner'] = value
+                entry['misses'] += 1
+                self.stats['misses'] += 1
+            entry['failures'] = 0
+            entry['updated_at'] = datetime.now().isoformat()
+            self._dirty = True
+        return hit
+
+    def record_failure(self, key):
+        """후보 모두 실패 기록 (기억한 항목이 연속 실패하면 강등)
+
+        반환값: 이번에 강등되었는지 여부
+        """
+        with self._lock:
+            self.stats['misses'] += 1
+            entry = self.entries.get(key)
+            if not entry or not entry.get('winner'):
+                return False
+            entry['misses'] += 1
+            entry['failures'] += 1
+            self._dirty = True
+            if entry['failures'] < self.max_failures:
+                return False
+            entry['winner'] = None
+            entry['failures'] = 0
+            self.stats['demoted'] += 1
+            return True
@@ -4,37 +4,417 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.firefox.options import Options
+from selenium.common.exceptions import TimeoutException
 import requests
 import os
 import time
-from urllib.parse import urlparse
+from urllib.parse import quote
 import re
+import sys
+import copy
+import shutil
 import json
+import queue
+import hashlib
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from download_utils import (
+    HostConcurrencyLimiter, AdaptiveRateLimiter, RetryQueue, UrlFeed, classify_download_error, parse_retry_after,
+    create_http_session, import_selenium_cookies, get_connection_stats,
+    DownloadCancelled, ImageRejected, inspect_image_stream, get_part_path, build_range_headers,
+    get_expected_length, stream_to_part_file, verify_part_file, find_incomplete_run_folder, ResolutionProber,
+    DownloadIndex, DownloadScheduler
+)
+from cache_utils import ContentStore, HttpCache, CrawlState, SessionCookieStore, SelectorCache
+from order_api import OrderHistoryClient, OrderApiError, create_endpoint
+from url_rules import ImageUrlRules, VariantIndex
 
 class AdvancedMusinsaCrawlerFirefox:
-    def __init__(self, download_folder="musinsa_images", config_file="crawler_config.json"):
+    # download_priority 설정으로 고를 수 있는 다운로드 순서
+    DOWNLOAD_PRIORITY_POLICIES = ("newest", "highest_resolution", "smallest", "fifo")
+    
+    # 셀렉터(CSS 또는 '//'로 시작하는 XPath) 목록 중 처음 일치하는 요소를 한 번의 호출로 찾는 스크립트
+    FIND_FIRST_ELEMENT_SCRIPT = """
+        const selectors = arguments[0];
+        const visibleOnly = arguments[1];
+        for (let i = 0; i < selectors.length; i++) {
+            const sel = selectors[i];
+            let el = null;
+            try {
+                if (sel.startsWith('//')) {
+                    el = document.evaluate(sel, document, null,
+                        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+                } else {
+                    el = document.querySelector(sel);
+                }
+            } catch (e) {
+                continue;
+            }
+            if (el && (!visibleOnly || (el.getClientRects().length > 0 && !el.disabled))) {
+                return [i, el];
+            }
+        }
+        return null;
+    """
+    
+    # DOM을 한 번만 순회하며 이미지 후보 속성값과 셀렉터별 일치 수를 함께 반환하는 스크립트
+    EXTRACT_IMAGE_CANDIDATES_SCRIPT = """
+        const selectors = arguments[0];
+        const hits = new Array(selectors.length).fill(0);
+        const urls = new Set();
+        const resolve = (value) => {
+            try { return new URL(value, document.baseURI).href; } catch (e) { return null; }
+        };
+        const add = (value) => {
+            if (!value || value.startsWith('data:')) return;
+            const url = resolve(value.trim());
+            if (url) urls.add(url);
+        };
+        
+        const nodes = document.querySelectorAll(
+            'img, source, [data-src], [data-original], [data-lazy-src], [data-lazy], [srcset], [data-srcset]');
+        for (const el of nodes) {
+            for (let i = 0; i < selectors.length; i++) {
+                try {
+                    if (el.matches(selectors[i])) hits[i]++;
+                } catch (e) {}
+            }
+            add(el.getAttribute('src'));
+            add(el.getAttribute('data-src'));
+            add(el.getAttribute('data-original'));
+            add(el.getAttribute('data-lazy-src'));
+            add(el.getAttribute('data-lazy'));
+            const srcset = el.getAttribute('srcset') || el.getAttribute('data-srcset');
+            if (srcset) {
+                srcset.split(',').forEach(entry => add(entry.trim().split(/\\s+/)[0]));
+            }
+        }
+        return {hits: hits, urls: Array.from(urls)};
+    """
+    
+    # 마지막 호출 이후 추가되거나 이미지 속성이 바뀐 노드에서만 이미지 URL과 주문 번호를 수집하는 스크립트
+    # 첫 호출에서 문서 전체를 한 번 훑고 MutationObserver를 설치하며, 이후에는 관찰된 노드만 처리합니다.
+    EXTRACT_NEW_NODES_SCRIPT = """
+        const candidateSelector =
+            'img, source, [data-src], [data-original], [data-lazy-src], [data-lazy], [srcset], [data-srcset]';
+        const orderSelector = '[data-order-no], [data-order-id], [data-ord-no], a[href*="order"]';
+        
+        let state = window.__musinsaIncremental;
+        let roots;
+        if (!state) {
+            state = {pending: new Set(), observer: null};
+            state.observer = new MutationObserver(records => {
+                for (const record of records) {
+                    if (record.type === 'attributes') {
+                        state.pending.add(record.target);
+                    } else {
+                        record.addedNodes.forEach(node => {
+                            if (node.nodeType === 1) state.pending.add(node);
+                        });
+                    }
+                }
+            });
+            state.observer.observe(document.body, {
+                childList: true, subtree: true, attributes: true,
+                attributeFilter: ['src', 'srcset', 'data-src', 'data-srcset', 'data-original', 'data-lazy-src', 'data-lazy']
+            });
+            window.__musinsaIncremental = state;
+            roots = [document.body];
+        } else {
+            // 아직 전달되지 않은 변경 기록까지 반영한 뒤 대기 노드를 비움
+            state.observer.takeRecords().forEach(record => {
+                if (record.type === 'attributes') state.pending.add(record.target);
+                else record.addedNodes.forEach(node => { if (node.nodeType === 1) state.pending.add(node); });
+            });
+            roots = Array.from(state.pending).filter(node => node.isConnected);
+            state.pending.clear();
+        }
+        
+        const urls = new Set();
+        const orderIds = new Set();
+        const visited = new Set();
+        const resolve = (value) => {
+            try { return new URL(value, document.baseURI).href; } catch (e) { return null; }
+        };
+        const add = (value) => {
+            if (!value || value.startsWith('data:')) return;
+            const url = resolve(value.trim());
+            if (url) urls.add(url);
+        };
+        const inspect = (el) => {
+            if (visited.has(el)) return;
+            visited.add(el);
+            if (el.matches(candidateSelector)) {
+                add(el.getAttribute('src'));
+                add(el.getAttribute('data-src'));
+                add(el.getAttribute('data-original'));
+                add(el.getAttribute('data-lazy-src'));
+                add(el.getAttribute('data-lazy'));
+                const srcset = el.getAttribute('srcset') || el.getAttribute('data-srcset');
+                if (srcset) {
+                    srcset.split(',').forEach(entry => add(entry.trim().split(/\\s+/)[0]));
+                }
+            }
+            if (el.matches(orderSelector)) {
+                const raw = el.dataset.orderNo || el.dataset.orderId || el.dataset.ordNo ||
+                            el.getAttribute('href') || '';
+                const match = raw.match(/(\\d{8,})/);
+                if (match) orderIds.add(match[1]);
+            }
+        };
+        
+        for (const root of roots) {
+            inspect(root);
+            root.querySelectorAll(candidateSelector + ', ' + orderSelector).forEach(inspect);
+        }
+        return {urls: Array.from(urls), orderIds: Array.from(orderIds), scanned: visited.size};
+    """
+    
+    # 처리가 끝난 주문 노드를 DOM에서 제거 (중첩된 노드는 가장 바깥 것만 제거)
+    PRUNE_PROCESSED_ORDERS_SCRIPT = """
+        const nodes = Array.from(document.querySelectorAll(arguments[0]));
+        let removed = 0;
+        for (const node of nodes) {
+            if (node.isConnected && !nodes.some(other => other !== node && other.isConnected && other.contains(node))) {
+                node.remove();
+                removed++;
+            }
+        }
+        if (window.__musinsaIncremental) window.__musinsaIncremental.observer.takeRecords();
+        return removed;
+    """
+    
+    # 주문/상품 컨테이너 안에서만 TreeWalker로 백그라운드 이미지를 찾는 스크립트
+    # 인라인 style에 url(이 있거나 클래스명이 이미지 관련일 때만 getComputedStyle을 호출하며,
+    # 청크 시간 예산을 넘으면 진행 상태를 window에 남기고 중간 결과를 반환합니다.
+    EXTRACT_BACKGROUND_IMAGES_SCRIPT = """
+        const containerSelector = arguments[0];
+        const chunkBudgetMs = arguments[1];
+        const reset = arguments[2];
+        
+        let state = window.__musinsaBgState;
+        if (reset || !state) {
+            let roots = Array.from(document.querySelectorAll(containerSelector));
+            roots = roots.filter(r => !roots.some(o => o !== r && o.contains(r)));
+            if (roots.length === 0) roots = [document.body];
+            state = {roots: roots, rootIndex: 0, walker: null, scanned: 0, styled: 0};
+            window.__musinsaBgState = state;
+        }
+        
+        const start = performance.now();
+        const urls = [];
+        const urlPattern = /url\\(['"]?([^'")]+)['"]?\\)/g;
+        const classHint = /(thumb|img|image|photo|bg|product|goods|item)/i;
+        const collect = (value) => {
+            let match;
+            urlPattern.lastIndex = 0;
+            while ((match = urlPattern.exec(value)) !== null) urls.push(match[1]);
+        };
+        const inspect = (node) => {
+            const inline = node.getAttribute('style');
+            if (inline && inline.includes('url(')) {
+                collect(inline);
+            } else if (typeof node.className === 'string' && classHint.test(node.className)) {
+                state.styled++;
+                const bg = window.getComputedStyle(node).backgroundImage;
+                if (bg && bg !== 'none') collect(bg);
+            }
+            state.scanned++;
+        };
+        
+        while (state.rootIndex < state.roots.length) {
+            if (!state.walker) {
+                const root = state.roots[state.rootIndex];
+                state.walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+                inspect(root);
+            }
+            let node;
+            while ((node = state.walker.nextNode()) !== null) {
+                inspect(node);
+                if ((state.scanned & 63) === 0 && performance.now() - start > chunkBudgetMs) {
+                    return {urls: urls, done: false, scanned: state.scanned, styled: state.styled};
+                }
+            }
+            state.walker = null;
+            state.rootIndex++;
+        }
+        
+        delete window.__musinsaBgState;
+        return {urls: urls, done: true, scanned: state.scanned, styled: state.styled,
+                containers: state.roots.length};
+    """
+    
+    # 이미지 로딩을 막은 상태에서 지연 로딩을 발생시키는 비동기 스크립트
+    # 화면 높이만큼 내려가며 매 단계 두 프레임을 기다려 IntersectionObserver 콜백이
+    # data-* 값을 src/srcset으로 옮길 시간을 준 뒤 상단으로 돌아갑니다.
+    TRIGGER_LAZY_LOAD_SCRIPT = """
+        const maxSteps = arguments[0];
+        const done = arguments[arguments.length - 1];
+        const nextFrame = () => new Promise(resolve =>
+            requestAnimationFrame(() => requestAnimationFrame(resolve)));
+        
+        (async () => {
+            let steps = 0;
+            let y = 0;
+            while (steps < maxSteps && y < document.body.scrollHeight) {
+                y += window.innerHeight;
+                window.scrollTo(0, y);
+                await nextFrame();
+                steps++;
+            }
+            window.scrollTo(0, 0);
+            done({steps: steps, height: document.body.scrollHeight});
+        })().catch(() => done(null));
+    """
+    
+    def __init__(self, download_folder="musinsa_images", config_file="crawler_config.json",
+                 use_browser=True, reuse_folder=False):
         """
         고급 무신사 크롤러 초기화 (Firefox 버전)
+        
+        Firefox는 driver 속성을 처음 사용할 때 시작합니다.
+        use_browser=False면 Firefox를 시작하지 않고(실패 이미지 재시도 등),
+        reuse_folder=True면 download_folder를 새 폴더 대신 그대로 사용합니다.
         """
         self.download_folder = download_folder
         self.config_file = config_file
-        self.driver = None
+        self.use_browser = use_browser
+        self._driver = None
+        self.pending_driver_cookies = None
+        self.startup_timings = {}
+        self.shard_id = None
+        self.stop_event = threading.Event()
         self.config = self.load_config()
-        self.setup_driver()
-        self.create_download_folder()
+        if not reuse_folder:
+            self.create_download_folder()
         self.session_log = []
+        self.http_session = create_http_session(self.config.get("download_workers", 8))
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=self.config.get("rate_limit_rps", 4.0),
+            burst=self.config.get("rate_limit_burst", 4),
+            min_rate=self.config.get("rate_limit_min_rps", 0.5),
+            max_rate=self.config.get("rate_limit_max_rps", 20.0),
+            on_rate_change=self.on_rate_change
+        )
+        cache_folder = self.config.get("cache_folder", "musinsa_cache")
+        self.content_store = None
+        if self.config.get("content_store_enabled", True):
+            self.content_store = ContentStore(os.path.join(cache_folder, "blobs"))
+        self.http_cache = None
+        if self.config.get("http_cache_enabled", True):
+            if self.content_store:
+                self.http_cache = HttpCache(cache_folder, self.content_store)
+            else:
+                print("HTTP 캐시는 내용 저장소에 본문을 보관하므로 content_store_enabled가 꺼져 있으면 사용하지 않습니다.")
+        self.selector_cache = None
+        if self.config.get("selector_cache_enabled", True):
+            self.selector_cache = SelectorCache(cache_folder)
+        
+        # 실행 간 수집 상태 (설정 파일과 같은 폴더)
+        state_file = os.path.join(os.path.dirname(os.path.abspath(self.config_file)),
+                                  self.config.get("crawl_state_file", "crawl_state.db"))
+        self.crawl_state = CrawlState(state_file)
+        self.session_store = SessionCookieStore(
+            os.path.join(os.path.dirname(os.path.abspath(self.config_file)),
+                         self.config.get("session_file", "login_session.json")),
+            max_age_hours=self.config.get("session_max_age_hours", 72)
+        )
+        # 해상도 확인을 쓰면 추출 단계는 URL을 그대로 두고 다운로드 단계에서 실제로 있는 가장 큰 크기를 고름
+        probe_enabled = self.config.get("resolution_probe_enabled", True)
+        self.url_rules = ImageUrlRules(rewrite=not probe_enabled)
+        self.resolution_prober = None
+        if probe_enabled:
+            self.resolution_prober = ResolutionProber(
+                self.http_session,
+                self.url_rules,
+                cache_path=os.path.join(cache_folder, "resolution_rules.json"),
+                max_workers=self.config.get("resolution_probe_workers", 4),
+                timeout=self.config.get("resolution_probe_timeout", 5),
+                rate_limiter=self.rate_limiter
+            )
+        self.collected_order_ids = set()
+        # 페이지·추출 단계·샤드 작업자가 공유하는 이미지 정체성별 최선 URL
+        self.image_variants = VariantIndex(self.url_rules)
+        self.url_feed = None
+        self.wait_timings = []
+        self.extraction_costs = {}
     
     def load_config(self):
         """설정 파일 로드"""
         default_config = {
             "max_images": 1000,
-            "download_delay": 0.5,
+            "rate_limit_rps": 4.0,
+            "rate_limit_burst": 4,
+            "rate_limit_min_rps": 0.5,
+            "rate_limit_max_rps": 20.0,
             "page_load_timeout": 30,
             "implicit_wait": 10,
             "retry_attempts": 3,
             "image_quality_filter": True,
-            "headless_mode": False
+            "min_image_dimension": 100,
+            "headless_mode": False,
+            "download_workers": 8,
+            "per_host_concurrency": 4,
+            "resume_incomplete_run": True,
+            "http_cache_enabled": True,
+            "cache_folder": "musinsa_cache",
+            "content_store_enabled": True,
+            "crawl_state_file": "crawl_state.db",
+            "incremental_mode": False,
+            "download_max_attempts": 4,
+            "retry_base_delay": 1.0,
+            "retry_max_delay": 60.0,
+            "streaming_pipeline": True,
+            "pipeline_queue_size": 200,
+            "wait_timeout": 10,
+            "order_page_wait_timeout": 5,
+            "bg_extract_budget_ms": 1500,
+            "bg_extract_chunk_ms": 200,
+            "browserless_mode": False,
+            "order_api_handler": "musinsa",
+            "order_api_base_url": "https://www.musinsa.com",
+            "order_api_path": "/order-service/my/order/list",
+            "order_api_page_size": 20,
+            "order_api_max_pages": 200,
+            "order_api_record_folder": "",
+            "persist_login_session": True,
+            "session_file": "login_session.json",
+            "session_max_age_hours": 72,
+            "session_check_url": "https://www.musinsa.com/order/order-list",
+            "geckodriver_path": "",
+            "driver_cache_max_age_hours": 168,
+            "lean_browser_profile": True,
+            "blocked_hosts": [
+                "google-analytics.com",
+                "googletagmanager.com",
+                "doubleclick.net",
+                "googlesyndication.com",
+                "facebook.net",
+                "connect.facebook.com",
+                "criteo.com",
+                "criteo.net",
+                "scorecardresearch.com",
+                "hotjar.com",
+                "clarity.ms",
+                "appsflyer.com",
+                "amplitude.com",
+                "braze.com"
+            ],
+            "sharded_crawl": False,
+            "sharded_page_url_template": "https://www.musinsa.com/order/order-list?page={page}",
+            "shard_workers": 3,
+            "shard_worker_memory_mb": 400,
+            "shard_memory_limit_mb": 2048,
+            "shard_max_pages": 200,
+            "prune_processed_orders": False,
+            "prune_container_selector": ".order-item, [data-order-no], [data-order-id], [data-ord-no]",
+            "selector_cache_enabled": True,
+            "resolution_probe_enabled": True,
+            "resolution_probe_workers": 4,
+            "resolution_probe_timeout": 5,
+            "download_priority": "newest",
+            "download_byte_budget_mb": 0
         }
         
         if os.path.exists(self.config_file):
@@ -47,6 +427,20 @@ class AdvancedMusinsaCrawlerFirefox:
         
         return default_config
     
+    @property
+    def driver(self):
+        """Firefox 드라이버 (처음 사용할 때 시작)"""
+        if self._driver is None and self.use_browser:
+            self.setup_driver()
+            if self.pending_driver_cookies:
+                cookies, self.pending_driver_cookies = self.pending_driver_cookies, None
+                self.apply_cookies_to_driver(cookies)
+        return self._driver
+    
+    @driver.setter
+    def driver(self, value):
+        self._driver = value
+    
     def setup_driver(self):
         """Firefox 드라이버 자동 설정 (이미지 로딩 활성화)"""
         try:
@@ -59,8 +453,13 @@ class AdvancedMusinsaCrawlerFirefox:
             firefox_options.add_argument("--no-sandbox")
             firefox_options.add_argument("--disable-dev-shm-usage")
             
-            # 이미지 로딩 활성화 (기존에 비활성화되어 있었음)
-            firefox_options.set_preference("permissions.default.image", 1)  # 이미지 활성화
+            lean_profile = self.config.get("lean_browser_profile", True)
+            if lean_profile:
+                # URL은 data-*/srcset 속성에서 읽으므로 렌더링용 이미지·미디어·폰트·추적 스크립트는 받지 않음
+                self.apply_lean_profile(firefox_options)
+            else:
+                # 이미지 로딩 활성화 (기존에 비활성화되어 있었음)
+                firefox_options.set_preference("permissions.default.image", 1)  # 이미지 활성화
             firefox_options.set_preference("dom.ipc.plugins.enabled.libflashplayer.so", False)
             firefox_options.set_preference("general.useragent.override", 
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0")
@@ -70,23 +469,21 @@ class AdvancedMusinsaCrawlerFirefox:
             
             print("Firefox 드라이버 설정 중...")
             
-            try:
-                # geckodriver 자동 설치 시도
-                from webdriver_manager.firefox import GeckoDriverManager
-                service = Service(GeckoDriverManager().install())
-            except ImportError:
-                print("webdriver-manager for Firefox 설치 필요")
-                print("실행: pip install webdriver-manager")
-                # 시스템 PATH의 geckodriver 사용
-                service = Service()
+            start = time.monotonic()
+            driver_path = self.resolve_geckodriver_path()
+            self.record_startup_phase("resolve_driver", time.monotonic() - start)
+            # 경로를 찾지 못하면 Selenium이 시스템 PATH에서 찾음
+            service = Service(driver_path) if driver_path else Service()
             
+            start = time.monotonic()
             self.driver = webdriver.Firefox(service=service, options=firefox_options)
             
             # 타임아웃 설정
             self.driver.implicitly_wait(self.config.get("implicit_wait", 10))
             self.driver.set_page_load_timeout(self.config.get("page_load_timeout", 30))
+            self.record_startup_phase("launch_browser", time.monotonic() - start)
             
-            print("Firefox 드라이버 설정 완료 (이미지 로딩 활성화)")
+            print(f"Firefox 드라이버 설정 완료 ({'경량 프로필' if lean_profile else '이미지 로딩 활성화'})")
             
         except Exception as e:
             print(f"Firefox 드라이버 설정 오류: {e}")
@@ -94,8 +491,138 @@ class AdvancedMusinsaCrawlerFirefox:
             print("다운로드: https://www.mozilla.org/firefox/")
             raise
     
+    def apply_lean_profile(self, firefox_options):
+        """이미지·미디어·웹 폰트와 제3자 추적 호스트를 차단하는 경량 프로필 설정"""
+        firefox_options.set_preference("permissions.default.image", 2)  # 이미지 차단
+        firefox_options.set_preference("media.autoplay.default", 5)  # 자동 재생 차단
+        firefox_options.set_preference("media.autoplay.blocking_policy", 2)
+        firefox_options.set_preference("media.mediasource.enabled", False)
+        firefox_options.set_preference("gfx.downloadable_fonts.enabled", False)
+        firefox_options.set_preference("browser.display.use_document_fonts", 0)
+        firefox_options.set_preference("privacy.trackingprotection.enabled", True)
+        firefox_options.set_preference("privacy.trackingprotection.socialtracking.enabled", True)
+        
+        # 차단 호스트는 닫힌 포트로 보내는 PAC 스크립트로 즉시 실패시킴
+        blocked_hosts = self.config.get("blocked_hosts", [])
+        if blocked_hosts:
+            pac = (
+                "function FindProxyForURL(url, host) {"
+                f" var blocked = {json.dumps(blocked_hosts)};"
+                " for (var i = 0; i < blocked.length; i++) {"
+                "  if (host === blocked[i] || dnsDomainIs(host, '.' + blocked[i])) return 'PROXY 127.0.0.1:9';"
+                " }"
+                " return 'DIRECT';"
+                "}"
+            )
+            firefox_options.set_preference("network.proxy.type", 2)
+            firefox_options.set_preference("network.proxy.failover_direct", False)
+            firefox_options.set_preference("network.proxy.autoconfig_url",
+                                           "data:text/javascript," + quote(pac))
+    
+    def resolve_geckodriver_path(self):
+        """geckodriver 경로 확인 (설정 > 로컬 캐시 > webdriver-manager > 시스템 PATH 순)
+        
+        webdriver-manager는 네트워크로 최신 버전을 확인하므로 결과를 캐시하고,
+        오프라인이거나 실패하면 만료된 캐시 경로라도 사용합니다.
+        """
+        configured = self.config.get("geckodriver_path")
+        if configured and os.path.exists(configured):
+            return configured
+        
+        cache_path = os.path.join(self.config.get("cache_folder", "musinsa_cache"), "geckodriver_path.json")
+        cached = {}
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+            except Exception:
+                cached = {}
+        cached_path = cached.get('path')
+        if cached_path and not os.path.exists(cached_path):
+            cached_path = None
+        
+        max_age = self.config.get("driver_cache_max_age_hours", 168) * 3600
+        if cached_path and time.time() - cached.get('resolved_at', 0) < max_age:
+            print(f"캐시된 geckodriver 사용: {cached_path}")
+            return cached_path
+        
+        try:
+            # geckodriver 자동 설치 시도
+            from webdriver_manager.firefox import GeckoDriverManager
+            driver_path = GeckoDriverManager().install()
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'path': driver_path, 'resolved_at': time.time()}, f, indent=2)
+            return driver_path
+        except ImportError:
+            print("webdriver-manager for Firefox 설치 필요")
+            print("실행: pip install webdriver-manager")
+        except Exception as e:
+            print(f"geckodriver 확인 실패 (오프라인?): {e}")
+        
+        if cached_path:
+            print(f"만료된 캐시의 geckodriver 사용: {cached_path}")
+            return cached_path
+        # 시스템 PATH의 geckodriver 사용
+        return shutil.which("geckodriver")
+    
+    def open_page(self, url):
+        """페이지 이동 (브라우저 시작 후 첫 페이지 로드 시간 기록)"""
+        driver = self.driver
+        start = time.monotonic()
+        driver.get(url)
+        if "first_page" not in self.startup_timings:
+            self.record_startup_phase("first_page", time.monotonic() - start)
+            self.report_startup_timings()
+    
+    def record_startup_phase(self, phase, seconds):
+        """시작 단계별 소요 시간 기록"""
+        self.startup_timings[phase] = round(seconds, 2)
+        self.log_session(f"시작 단계 [{phase}]: {seconds:.2f}초")
+    
+    def report_startup_timings(self):
+        """시작 단계 시간 출력 및 이전 실행 대비 지연 확인
+        
+        최근 실행 기록은 캐시 폴더에 남기고, 이번 합계가 중앙값의 1.5배를 넘으면 경고합니다.
+        """
+        total = sum(self.startup_timings.values())
+        phases = ", ".join(f"{phase} {seconds:.2f}초" for phase, seconds in self.startup_timings.items())
+        if self.shard_id is not None:
+            # 샤드 작업자는 기록 파일을 동시에 쓰지 않도록 출력만 함
+            print(f"[샤드 {self.shard_id}] 브라우저 시작 시간: {phases} (합계 {total:.2f}초)")
+            return
+        print(f"브라우저 시작 시간: {phases} (합계 {total:.2f}초)")
+        
+        history_path = os.path.join(self.config.get("cache_folder", "musinsa_cache"), "startup_history.json")
+        history = []
+        try:
+            if os.path.exists(history_path):
+                with open(history_path, 'r', encoding='utf-8') as f:
+                    history = json.load(f)
+            
+            totals = sorted(sum(entry['phases'].values()) for entry in history)
+            if totals:
+                median = totals[len(totals) // 2]
+                if median > 0 and total > median * 1.5:
+                    print(f"⚠️ 브라우저 시작이 평소(중앙값 {median:.2f}초)보다 느립니다.")
+                    self.log_session(f"시작 시간 지연: {total:.2f}초 (중앙값 {median:.2f}초)")
+            
+            history.append({'timestamp': datetime.now().isoformat(), 'phases': dict(self.startup_timings)})
+            os.makedirs(os.path.dirname(history_path), exist_ok=True)
+            with open(history_path, 'w', encoding='utf-8') as f:
+                json.dump(history[-20:], f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"시작 시간 기록 실패: {e}")
+    
     def create_download_folder(self):
-        """다운로드 폴더 생성"""
+        """다운로드 폴더 생성 (중단된 이전 실행이 있으면 해당 폴더 재사용)"""
+        if self.config.get("resume_incomplete_run", True):
+            incomplete_folder = find_incomplete_run_folder(self.download_folder)
+            if incomplete_folder:
+                self.download_folder = incomplete_folder
+                print(f"중단된 다운로드 폴더 재사용: {self.download_folder}")
+                return
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.download_folder = f"{self.download_folder}_{timestamp}"
         
@@ -103,6 +630,79 @@ class AdvancedMusinsaCrawlerFirefox:
             os.makedirs(self.download_folder)
             print(f"다운로드 폴더 생성: {self.download_folder}")
     
+    def login(self, username, password):
+        """저장된 로그인 세션을 먼저 재사용하고, 만료되었을 때만 폼 로그인"""
+        persist = self.config.get("persist_login_session", True)
+        if persist and self.restore_saved_session():
+            return True
+        
+        if not self.login_with_retry(username, password):
+            return False
+        
+        if persist and self._driver:
+            try:
+                self.session_store.save(self.driver.get_cookies())
+                print("로그인 세션 저장 완료")
+            except Exception as e:
+                print(f"로그인 세션 저장 실패: {e}")
+        return True
+    
+    def restore_saved_session(self):
+        """저장된 쿠키가 아직 유효하면 HTTP 세션과 브라우저에 적용"""
+        cookies = self.session_store.load()
+        if not cookies:
+            return False
+        
+        start = time.monotonic()
+        import_selenium_cookies(self.http_session, cookies)
+        if not self.is_session_valid():
+            print("저장된 로그인 세션이 만료되어 폼 로그인을 진행합니다.")
+            self.http_session.cookies.clear()
+            self.session_store.clear()
+            return False
+        
+        if self._driver:
+            self.apply_cookies_to_driver(cookies)
+        else:
+            # 브라우저가 필요해지면 시작 직후 적용 (브라우저 없는 모드에서는 시작하지 않음)
+            self.pending_driver_cookies = cookies
+        
+        elapsed = time.monotonic() - start
+        print(f"저장된 로그인 세션 재사용 ({elapsed:.2f}초)")
+        self.log_session(f"저장된 로그인 세션 재사용 ({elapsed:.2f}초)")
+        return True
+    
+    def is_session_valid(self):
+        """HTTP 요청 한 번으로 세션 유효성 확인 (로그인 페이지로 리다이렉트되면 만료)"""
+        check_url = self.config.get("session_check_url", "https://www.musinsa.com/order/order-list")
+        try:
+            response = self.http_session.get(check_url, allow_redirects=False,
+                                             timeout=self.config.get("wait_timeout", 10))
+        except requests.exceptions.RequestException as e:
+            print(f"로그인 세션 확인 실패: {e}")
+            return False
+        
+        if response.is_redirect:
+            location = response.headers.get('Location', '')
+            return "login" not in location and "auth" not in location
+        return response.status_code == 200
+    
+    def apply_cookies_to_driver(self, cookies):
+        """저장된 쿠키를 브라우저에 적용 (해당 도메인 페이지에 있어야 추가 가능)"""
+        self.open_page("https://www.musinsa.com/robots.txt")
+        applied = 0
+        for cookie in cookies:
+            cookie = {key: value for key, value in cookie.items()
+                      if key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'expiry')
+                      and value is not None}
+            try:
+                self.driver.add_cookie(cookie)
+                applied += 1
+            except Exception as e:
+                print(f"쿠키 적용 실패 ({cookie.get('name')}): {e}")
+        print(f"저장된 쿠키 {applied}개를 브라우저에 적용")
+        return applied
+    
     def login_with_retry(self, username, password):
         """재시도 로직이 있는 로그인"""
         max_attempts = self.config.get("retry_attempts", 3)
@@ -111,8 +711,8 @@ class AdvancedMusinsaCrawlerFirefox:
             try:
                 print(f"로그인 시도 {attempt + 1}/{max_attempts}")
                 
-                self.driver.get("https://www.musinsa.com/auth/login")
-                time.sleep(5)  # 페이지 로딩 충분히 대기
+                self.open_page("https://www.musinsa.com/auth/login")
+                self.wait_for_dom_ready("로그인 페이지 DOM")
                 
                 print("현재 페이지 URL:", self.driver.current_url)
                 print("페이지 제목:", self.driver.title)
@@ -130,25 +730,25 @@ class AdvancedMusinsaCrawlerFirefox:
                     "#id",
                     "#loginId"
                 ]
+                username_selectors = self.learned_order("login.username", username_selectors)
                 
-                username_field = None
-                for selector in username_selectors:
-                    try:
-                        username_field = WebDriverWait(self.driver, 3).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                        )
-                        print(f"아이디 필드 발견: {selector}")
-                        break
-                    except:
-                        continue
+                # 필드가 나타날 때까지 한 번에 대기 (셀렉터별 개별 대기 없음)
+                found = self.timed_wait(
+                    "아이디 입력 필드",
+                    lambda d: self.find_first_element(username_selectors)
+                )
                 
-                if not username_field:
+                if not found:
+                    self.remember_failure("login.username")
                     print("아이디 입력 필드를 찾을 수 없습니다.")
                     # 페이지 소스 일부 출력 (디버깅용)
                     page_source = self.driver.page_source[:2000]
                     print("페이지 소스 일부:", page_source)
                     continue
                 
+                selector, username_field = found
+                self.remember_success("login.username", selector)
+                print(f"아이디 필드 발견: {selector}")
                 username_field.clear()
                 username_field.send_keys(username)
                 print("아이디 입력 완료")
@@ -166,22 +766,21 @@ class AdvancedMusinsaCrawlerFirefox:
                     "#pw",
                     "#password"
                 ]
+                password_selectors = self.learned_order("login.password", password_selectors)
                 
-                password_field = None
-                for selector in password_selectors:
-                    try:
-                        password_field = WebDriverWait(self.driver, 3).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                        )
-                        print(f"비밀번호 필드 발견: {selector}")
-                        break
-                    except:
-                        continue
+                found = self.timed_wait(
+                    "비밀번호 입력 필드",
+                    lambda d: self.find_first_element(password_selectors)
+                )
                 
-                if not password_field:
+                if not found:
+                    self.remember_failure("login.password")
                     print("비밀번호 입력 필드를 찾을 수 없습니다.")
                     continue
                 
+                selector, password_field = found
+                self.remember_success("login.password", selector)
+                print(f"비밀번호 필드 발견: {selector}")
                 password_field.clear()
                 password_field.send_keys(password)
                 print("비밀번호 입력 완료")
@@ -190,7 +789,7 @@ class AdvancedMusinsaCrawlerFirefox:
                 login_button_selectors = [
                     "button[type='submit']",
                     "input[type='submit']",
-                    "button:contains('로그인')",
+                    "//button[contains(text(), '로그인')]",
                     ".btn-login",
                     ".login-btn",
                     "#loginBtn",
@@ -198,38 +797,34 @@ class AdvancedMusinsaCrawlerFirefox:
                     "button.submit",
                     ".submit-btn"
                 ]
+                login_button_selectors = self.learned_order("login.button", login_button_selectors)
                 
-                login_button = None
-                for selector in login_button_selectors:
-                    try:
-                        if "contains" in selector:
-                            # XPath로 변환
-                            xpath = f"//button[contains(text(), '로그인')]"
-                            login_button = WebDriverWait(self.driver, 3).until(
-                                EC.element_to_be_clickable((By.XPATH, xpath))
-                            )
-                        else:
-                            login_button = WebDriverWait(self.driver, 3).until(
-                                EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                            )
-                        print(f"로그인 버튼 발견: {selector}")
-                        break
-                    except:
-                        continue
+                # 화면에 보이고 활성화된 버튼만 클릭 대상으로 사용
+                found = self.timed_wait(
+                    "로그인 버튼",
+                    lambda d: self.find_first_element(login_button_selectors, visible_only=True)
+                )
                 
-                if not login_button:
+                if not found:
+                    self.remember_failure("login.button")
                     print("로그인 버튼을 찾을 수 없습니다.")
                     continue
                 
+                selector, login_button = found
+                self.remember_success("login.button", selector)
+                print(f"로그인 버튼 발견: {selector}")
+                login_url = self.driver.current_url
                 login_button.click()
                 print("로그인 버튼 클릭 완료")
                 
-                # 로그인 결과 대기
-                time.sleep(5)
+                # 로그인 결과 대기 (URL 변경 시 즉시 진행)
+                self.timed_wait("로그인 후 URL 변경", EC.url_changes(login_url))
+                self.wait_for_dom_ready("로그인 후 페이지 DOM")
                 
                 # 로그인 성공 확인
                 if self.is_logged_in():
                     print("로그인 성공!")
+                    self.sync_cookies_from_driver()
                     return True
                 else:
                     print(f"로그인 실패 (시도 {attempt + 1})")
@@ -244,6 +839,85 @@ class AdvancedMusinsaCrawlerFirefox:
         print("모든 로그인 시도 실패")
         return False
     
+    def sync_cookies_from_driver(self):
+        """브라우저의 로그인 쿠키를 다운로드용 HTTP 세션에 복사"""
+        try:
+            imported = import_selenium_cookies(self.http_session, self.driver.get_cookies())
+            print(f"브라우저 쿠키 {imported}개를 HTTP 세션에 적용")
+            return imported
+        except Exception as e:
+            print(f"쿠키 복사 실패: {e}")
+            return 0
+    
+    def timed_wait(self, label, condition, timeout=None):
+        """조건이 충족될 때까지 대기하고 실제 소요 시간 기록
+        
+        반환값: 조건 함수의 결과 (시간 초과 시 None)
+        """
+        if timeout is None:
+            timeout = self.config.get("wait_timeout", 10)
+        
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(condition)
+        except TimeoutException:
+            result = None
+        elapsed = time.monotonic() - start
+        
+        self.wait_timings.append({
+            'label': label,
+            'seconds': round(elapsed, 2),
+            'satisfied': result is not None
+        })
+        self.log_session(f"대기 [{label}]: {elapsed:.2f}초 ({'충족' if result is not None else '시간 초과'})")
+        return result
+    
+    def wait_for_dom_ready(self, label):
+        """document.readyState가 complete가 될 때까지 대기"""
+        return self.timed_wait(
+            label,
+            lambda d: d.execute_script("return document.readyState") == "complete" or None
+        )
+    
+    def find_first_element(self, selectors, visible_only=False):
+        """셀렉터 목록 중 현재 DOM에서 처음 일치하는 (셀렉터, 요소) 반환
+        
+        implicit wait의 영향을 받지 않도록 스크립트 한 번으로 확인하며, 없으면 None을 반환합니다.
+        """
+        try:
+            match = self.driver.execute_script(self.FIND_FIRST_ELEMENT_SCRIPT, selectors, visible_only)
+        except Exception:
+            return None
+        if not match:
+            return None
+        return selectors[match[0]], match[1]
+    
+    def learned_order(self, key, candidates):
+        """셀렉터 캐시가 기억한 항목을 먼저 시도하도록 후보 정렬"""
+        if self.selector_cache is None:
+            return list(candidates)
+        return self.selector_cache.order(key, candidates)
+    
+    def remember_success(self, key, value):
+        """성공한 셀렉터·URL을 캐시에 기록하고 적중 여부를 세션 로그에 남김"""
+        if self.selector_cache is None:
+            return
+        hit = self.selector_cache.record_success(key, value)
+        self.log_session(f"셀렉터 캐시 {'적중' if hit else '미스'} [{key}]: {value}")
+    
+    def remember_failure(self, key):
+        """후보를 모두 찾지 못했음을 캐시에 기록 (연속 실패 시 기억한 항목 강등)"""
+        if self.selector_cache is None:
+            return
+        demoted = self.selector_cache.record_failure(key)
+        self.log_session(f"셀렉터 캐시 실패 [{key}]" + (" - 기억한 항목 강등" if demoted else ""))
+    
+    def report_wait_timings(self):
+        """지금까지의 대기 시간 합계 출력"""
+        total_wait = sum(item['seconds'] for item in self.wait_timings)
+        print(f"조건 대기 {len(self.wait_timings)}회, 총 {total_wait:.1f}초")
+        self.log_session(f"시작 단계 대기 합계: {total_wait:.2f}초 ({len(self.wait_timings)}회)")
+    
     def is_logged_in(self):
         """로그인 상태 확인"""
         try:
@@ -269,25 +943,19 @@ class AdvancedMusinsaCrawlerFirefox:
                 "[data-testid='logout']"
             ]
             
-            for indicator in logged_in_indicators:
-                try:
-                    if indicator.startswith("//"):
-                        # XPath
-                        element = WebDriverWait(self.driver, 3).until(
-                            EC.presence_of_element_located((By.XPATH, indicator))
-                        )
-                    else:
-                        # CSS selector
-                        element = WebDriverWait(self.driver, 3).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, indicator))
-                        )
-                    
-                    if element:
-                        print(f"로그인 상태 확인됨: {indicator}")
-                        return True
-                except:
-                    continue
+            # 기억한 요소를 먼저 확인하고, 전체 목록은 한 번의 대기로 함께 확인
+            logged_in_indicators = self.learned_order("logged_in.indicator", logged_in_indicators)
+            found = self.timed_wait(
+                "로그인 상태 요소",
+                lambda d: self.find_first_element(logged_in_indicators),
+                timeout=3
+            )
+            if found:
+                print(f"로그인 상태 확인됨: {found[0]}")
+                self.remember_success("logged_in.indicator", found[0])
+                return True
             
+            self.remember_failure("logged_in.indicator")
             print("로그인 상태 확인 실패")
             return False
             
@@ -308,30 +976,37 @@ class AdvancedMusinsaCrawlerFirefox:
                 "https://www.musinsa.com/mypage/order"
             ]
             
+            # 구매 내역이 있는지 확인
+            order_indicators = [
+                ".order-item",
+                ".product-item", 
+                ".item-list",
+                "[class*='order']",
+                "img[src*='msscdn.net']"
+            ]
+            
+            # 지난 실행에서 성공한 URL·요소를 먼저 시도
+            order_urls = self.learned_order("order_history.url", order_urls)
+            order_indicators = self.learned_order("order_history.indicator", order_indicators)
+            
             success = False
             for url in order_urls:
                 try:
                     print(f"시도 중: {url}")
-                    self.driver.get(url)
-                    time.sleep(5)
+                    self.open_page(url)
+                    self.wait_for_dom_ready(f"구매 내역 DOM ({url})")
                     
-                    # 구매 내역이 있는지 확인
-                    order_indicators = [
-                        ".order-item",
-                        ".product-item", 
-                        ".item-list",
-                        "[class*='order']",
-                        "img[src*='msscdn.net']"
-                    ]
+                    found = self.timed_wait(
+                        f"구매 내역 요소 ({url})",
+                        lambda d: self.find_first_element(order_indicators),
+                        timeout=self.config.get("order_page_wait_timeout", 5)
+                    )
                     
-                    for indicator in order_indicators:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, indicator)
-                        if elements:
-                            print(f"구매 내역 발견: {indicator} ({len(elements)}개)")
-                            success = True
-                            break
-                    
-                    if success:
+                    if found:
+                        print(f"구매 내역 발견: {found[0]}")
+                        self.remember_success("order_history.url", url)
+                        self.remember_success("order_history.indicator", found[0])
+                        success = True
                         break
                         
                 except Exception as e:
@@ -339,12 +1014,17 @@ class AdvancedMusinsaCrawlerFirefox:
                     continue
             
             if not success:
+                self.remember_failure("order_history.url")
                 print("구매 내역 페이지를 찾을 수 없습니다.")
                 return False
             
-            # 페이지 완전 로딩 대기
+            # 상품 이미지가 나타날 때까지 대기 (고정 대기 없음)
             print("페이지 로딩 완료 대기 중...")
-            time.sleep(10)
+            self.timed_wait(
+                "구매 내역 상품 이미지",
+                lambda d: self.find_first_element(["img[src*='msscdn.net']", "img[data-src*='msscdn.net']"])
+            )
+            self.report_wait_timings()
             
             # 페이지 정보 출력 (디버깅)
             print(f"현재 URL: {self.driver.current_url}")
@@ -372,6 +1052,17 @@ class AdvancedMusinsaCrawlerFirefox:
                 # 페이지 끝까지 스크롤
                 self.scroll_to_bottom()
                 
+                # 이번 페이지에서 새로 추가된 노드만 추출 (스트리밍 파이프라인이면 바로 다운로드 단계로 전달)
+                page_urls, order_ids = self.extract_new_page_content(current_page)
+                
+                # 새로 나타난 주문 ID 수집, 증분 모드면 이전에 본 주문에서 중단
+                new_order_ids = order_ids - self.collected_order_ids
+                self.collected_order_ids.update(new_order_ids)
+                if self.config.get("incremental_mode", False) and self.crawl_state.has_seen_any_order(new_order_ids):
+                    print("이전에 수집한 주문에 도달하여 페이지 탐색을 중단합니다.")
+                    self.log_session(f"증분 모드: 페이지 {current_page}에서 탐색 중단")
+                    break
+                
                 # "더보기" 버튼 찾기 (XPath 사용)
                 more_button_found = False
                 more_button_xpaths = [
@@ -381,6 +1072,7 @@ class AdvancedMusinsaCrawlerFirefox:
                     "//button[contains(@class, 'load-more')]",
                     "//a[contains(text(), '더보기')]"
                 ]
+                more_button_xpaths = self.learned_order("order_history.more_button", more_button_xpaths)
                 
                 for xpath in more_button_xpaths:
                     try:
@@ -389,6 +1081,8 @@ class AdvancedMusinsaCrawlerFirefox:
                             if btn.is_displayed() and btn.is_enabled():
                                 self.driver.execute_script("arguments[0].click();", btn)
                                 print(f"더보기 버튼 클릭: {xpath}")
+                                if current_page == 1:
+                                    self.remember_success("order_history.more_button", xpath)
                                 time.sleep(3)
                                 more_button_found = True
                                 break
@@ -426,6 +1120,70 @@ class AdvancedMusinsaCrawlerFirefox:
                 print(f"페이지 {current_page} 로드 중 오류: {e}")
                 break
     
+    def extract_new_page_content(self, page_number):
+        """마지막 호출 이후 새로 추가된 노드에서만 이미지 URL과 주문 번호 수집
+        
+        DOM 전체를 매번 다시 훑지 않으므로 페이지가 늘어나도 페이지당 비용이 일정하며,
+        prune_processed_orders가 켜져 있으면 처리한 주문 노드를 DOM에서 제거해 브라우저 메모리도 유지합니다.
+        반환값: (이번에 새로 찾은 이미지 URL 목록, 주문 번호 집합)
+        """
+        start = time.monotonic()
+        try:
+            result = self.driver.execute_script(self.EXTRACT_NEW_NODES_SCRIPT) or {}
+        except Exception as e:
+            print(f"증분 추출 오류: {e}")
+            return [], set()
+        
+        candidate_urls = result.get('urls', [])
+        prune = self.config.get("prune_processed_orders", False)
+        if prune:
+            # 제거하기 전에 백그라운드 이미지도 수집
+            candidate_urls.extend(self.extract_background_images())
+        
+        new_urls = []
+        for high_res_url in self.url_rules.normalize_batch(candidate_urls):
+            if self.image_variants.add(high_res_url, page_number) == 'new':
+                new_urls.append(high_res_url)
+                self.emit_image_url(high_res_url)
+        
+        removed = 0
+        if prune:
+            try:
+                removed = self.driver.execute_script(
+                    self.PRUNE_PROCESSED_ORDERS_SCRIPT,
+                    self.config.get("prune_container_selector",
+                                    ".order-item, [data-order-no], [data-order-id], [data-ord-no]")
+                ) or 0
+            except Exception as e:
+                print(f"주문 노드 제거 오류: {e}")
+        
+        elapsed = time.monotonic() - start
+        print(f"페이지 {page_number}: 새 노드 {result.get('scanned', 0)}개 검사, "
+              f"새 이미지 URL {len(new_urls)}개" + (f", 주문 노드 {removed}개 제거" if prune else "") +
+              f" ({elapsed:.2f}초)")
+        self.log_session(f"페이지 {page_number} 증분 추출: 노드 {result.get('scanned', 0)}개, "
+                         f"URL {len(new_urls)}개, {elapsed:.2f}초")
+        return new_urls, set(result.get('orderIds', []))
+    
+    def get_visible_order_ids(self):
+        """현재 DOM에 있는 주문 번호 목록"""
+        try:
+            return self.driver.execute_script("""
+                const ids = new Set();
+                const nodes = document.querySelectorAll(
+                    '[data-order-no], [data-order-id], [data-ord-no], a[href*="order"]');
+                nodes.forEach(el => {
+                    const raw = el.dataset.orderNo || el.dataset.orderId || el.dataset.ordNo ||
+                                el.getAttribute('href') || '';
+                    const match = raw.match(/(\\d{8,})/);
+                    if (match) ids.add(match[1]);
+                });
+                return Array.from(ids);
+            """) or []
+        except Exception as e:
+            print(f"주문 번호 수집 오류: {e}")
+            return []
+    
     def scroll_to_bottom(self):
         """페이지 하단까지 스크롤"""
         last_height = self.driver.execute_script("return document.body.scrollHeight")
@@ -441,6 +1199,11 @@ class AdvancedMusinsaCrawlerFirefox:
     
     def scroll_and_load_images(self):
         """스크롤을 통한 지연 로딩 이미지 활성화"""
+        if self.config.get("lean_browser_profile", True):
+            # 이미지를 받지 않으므로 로딩 대기 없이 지연 로딩 트리거만 발생시킴
+            self.trigger_lazy_loaders()
+            return
+        
         try:
             # 현재 페이지 높이 가져오기
             last_height = self.driver.execute_script("return document.body.scrollHeight")
@@ -476,38 +1239,59 @@ class AdvancedMusinsaCrawlerFirefox:
         except Exception as e:
             print(f"스크롤 중 오류: {e}")
     
+    def trigger_lazy_loaders(self):
+        """화면 단위로 스크롤하며 IntersectionObserver 기반 지연 로딩을 발생시킴"""
+        try:
+            start = time.monotonic()
+            result = self.driver.execute_async_script(self.TRIGGER_LAZY_LOAD_SCRIPT, 200) or {}
+            elapsed = time.monotonic() - start
+            print(f"지연 로딩 트리거: {result.get('steps', 0)}단계 스크롤 ({elapsed:.2f}초)")
+            self.log_session(f"지연 로딩 트리거: {result.get('steps', 0)}단계, {elapsed:.2f}초")
+        except Exception as e:
+            print(f"지연 로딩 트리거 중 오류: {e}")
+    
     def extract_background_images(self):
-        """CSS 백그라운드 이미지 추출"""
+        """CSS 백그라운드 이미지 추출 (주문/상품 컨테이너 안에서만, 시간 예산 적용)"""
         try:
-            # JavaScript로 백그라운드 이미지 URL 추출
-            script = """
-            var bgImages = [];
-            var elements = document.querySelectorAll('*');
-            
-            for (var i = 0; i < elements.length; i++) {
-                var style = window.getComputedStyle(elements[i]);
-                var bgImage = style.backgroundImage;
-                
-                if (bgImage && bgImage !== 'none') {
-                    var match = bgImage.match(/url\\(['"]?([^'")]+)['"]?\\)/);
-                    if (match && match[1]) {
-                        bgImages.push(match[1]);
-                    }
-                }
-            }
-            
-            return bgImages;
-            """
-            
-            bg_urls = self.driver.execute_script(script)
+            container_selector = ", ".join([
+                ".order-item",
+                ".product-item",
+                ".item-list",
+                "[class*='order']",
+                "[class*='product']",
+                "[class*='goods']"
+            ])
+            budget = self.config.get("bg_extract_budget_ms", 1500) / 1000
+            chunk_ms = self.config.get("bg_extract_chunk_ms", 200)
+            
+            start = time.monotonic()
+            bg_urls = []
+            result = {}
+            reset = True
+            
+            # 청크 단위로 나눠 호출하여 브라우저가 오래 멈추지 않도록 함
+            while True:
+                result = self.driver.execute_script(
+                    self.EXTRACT_BACKGROUND_IMAGES_SCRIPT, container_selector, chunk_ms, reset)
+                reset = False
+                bg_urls.extend(result.get('urls', []))
+                if result.get('done'):
+                    break
+                if time.monotonic() - start > budget:
+                    print("백그라운드 이미지 추출 시간 예산 초과, 지금까지의 결과만 사용")
+                    break
             
-            valid_bg_images = set()
-            for url in bg_urls:
-                if self.is_valid_product_image(url):
-                    high_res_url = self.convert_to_high_resolution(url)
-                    valid_bg_images.add(high_res_url)
+            valid_bg_images = set(self.url_rules.normalize_batch(bg_urls))
             
-            print(f"백그라운드 이미지 {len(valid_bg_images)}개 추출")
+            elapsed = time.monotonic() - start
+            self.extraction_costs['background'] = {
+                'seconds': round(elapsed, 3),
+                'scanned': result.get('scanned', 0),
+                'computed_styles': result.get('styled', 0),
+                'complete': bool(result.get('done'))
+            }
+            print(f"백그라운드 이미지 {len(valid_bg_images)}개 추출 "
+                  f"(요소 {result.get('scanned', 0)}개 검사, 스타일 계산 {result.get('styled', 0)}개)")
             return valid_bg_images
             
         except Exception as e:
@@ -520,13 +1304,13 @@ class AdvancedMusinsaCrawlerFirefox:
             print("상품 이미지 추출 시작...")
             
             # 1. 페이지 완전 로딩 대기
-            time.sleep(5)
+            self.wait_for_dom_ready("이미지 추출 전 DOM")
             
             # 2. 스크롤을 통한 지연 로딩 이미지 활성화
             print("페이지 스크롤하여 이미지 로딩 중...")
             self.scroll_and_load_images()
             
-            # 3. 다양한 이미지 셀렉터로 검색
+            # 3. 셀렉터별 통계용 이미지 셀렉터 목록
             image_selectors = [
                 # 상품 썸네일 이미지
                 "img[src*='msscdn.net']",
@@ -561,63 +1345,45 @@ class AdvancedMusinsaCrawlerFirefox:
                 "img[data-lazy*='msscdn']"
             ]
             
-            all_images = set()
-            
-            for selector in image_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    print(f"셀렉터 '{selector}': {len(elements)}개 이미지 발견")
-                    
-                    for element in elements:
-                        # src 또는 data-src 속성에서 URL 추출
-                        img_url = element.get_attribute('src') or \
-                                 element.get_attribute('data-src') or \
-                                 element.get_attribute('data-lazy-src') or \
-                                 element.get_attribute('data-original')
-                        
-                        if img_url and self.is_valid_product_image(img_url):
-                            # 고해상도 버전으로 변환
-                            high_res_url = self.convert_to_high_resolution(img_url)
-                            all_images.add(high_res_url)
-                            print(f"유효한 이미지 URL 추가: {high_res_url[:80]}...")
-                            
-                except Exception as e:
-                    print(f"셀렉터 '{selector}' 처리 중 오류: {e}")
-                    continue
-            
-            # 4. JavaScript로 추가 이미지 탐색
-            try:
-                js_images = self.driver.execute_script("""
-                    const images = [];
-                    const allImages = document.querySelectorAll('img');
-                    allImages.forEach(img => {
-                        const src = img.src || img.dataset.src || img.dataset.original || img.dataset.lazySrc;
-                        if (src && (src.includes('msscdn.net') || src.includes('musinsa.com'))) {
-                            images.push(src);
-                        }
-                    });
-                    return images;
-                """)
-                
-                for url in js_images:
-                    if self.is_valid_product_image(url):
-                        high_res_url = self.convert_to_high_resolution(url)
-                        all_images.add(high_res_url)
-                        
-            except Exception as e:
-                print(f"JavaScript 이미지 추출 오류: {e}")
+            # 페이지를 넘기며 증분 추출한 URL은 이미 image_variants에 있음 (제거된 주문 노드의 이미지 포함)
+            def add_image(image_url):
+                # 새 이미지는 스트리밍 파이프라인으로 바로 전달, 같은 이미지의 다른 크기는 더 좋은 변형만 남김
+                if self.image_variants.add(image_url) == 'new':
+                    self.emit_image_url(image_url)
+            
+            # 4. 스크립트 한 번으로 모든 후보 속성(src, data-*, srcset) 수집 후 Python에서 필터링
+            img_start = time.monotonic()
+            candidate_urls, selector_hits = self.extract_image_candidates(image_selectors)
+            for selector, count in selector_hits.items():
+                print(f"셀렉터 '{selector}': {count}개 이미지 발견")
+            self.log_session(f"셀렉터별 일치 수: {selector_hits}")
+            
+            # 유효한 상품 이미지만 고해상도 버전으로 변환
+            for image_url in self.url_rules.normalize_batch(candidate_urls):
+                add_image(image_url)
+            print(f"후보 URL {len(candidate_urls)}개 중 유효한 이미지 {len(self.image_variants)}개")
+            self.extraction_costs['img'] = {
+                'seconds': round(time.monotonic() - img_start, 3),
+                'candidates': len(candidate_urls)
+            }
             
             # 5. 백그라운드 이미지도 검색
             bg_images = self.extract_background_images()
-            all_images.update(bg_images)
+            for bg_url in bg_images:
+                add_image(bg_url)
             
-            unique_images = list(all_images)
+            img_cost = self.extraction_costs.get('img', {})
+            bg_cost = self.extraction_costs.get('background', {})
+            print(f"추출 비용: <img> {img_cost.get('seconds', 0):.2f}초, "
+                  f"백그라운드 {bg_cost.get('seconds', 0):.2f}초")
+            self.log_session(f"추출 비용: {self.extraction_costs}")
             
-            # 최대 이미지 수 제한
-            max_images = self.config.get("max_images", 1000)
-            if len(unique_images) > max_images:
-                unique_images = unique_images[:max_images]
+            unique_images = self.image_variants.urls()
+            collapsed = self.url_rules.stats['collapsed'] + self.image_variants.stats['collapsed']
+            if collapsed:
+                print(f"같은 이미지의 크기·쿼리 변형 {collapsed}개를 하나로 합침")
             
+            # 최대 이미지 수는 다운로드 단계에서 우선순위 순으로 적용
             print(f"총 {len(unique_images)}개의 고유한 상품 이미지 URL 추출 완료")
             
             return unique_images
@@ -626,168 +1392,518 @@ class AdvancedMusinsaCrawlerFirefox:
             print(f"이미지 추출 중 오류: {e}")
             return []
     
-    def is_valid_product_image(self, url):
-        """유효한 상품 이미지 URL인지 확인"""
-        if not url or url.startswith('data:'):
-            return False
-        
-        # 무신사 관련 도메인 확인
-        valid_domains = ['msscdn.net', 'musinsa.com']
-        invalid_patterns = ['logo', 'banner', 'ad', 'icon', 'sprite']
+    def extract_image_candidates(self, selectors=()):
+        """DOM을 한 번 순회하여 이미지 후보 URL과 셀렉터별 일치 수 반환
         
+        요소마다 find_elements/get_attribute를 호출하지 않고 execute_script 한 번으로 처리합니다.
+        반환값: (중복 제거된 후보 URL 목록, {셀렉터: 일치 요소 수})
+        """
         try:
-            url_lower = url.lower()
-            
-            # 도메인 확인
-            domain_valid = any(domain in url_lower for domain in valid_domains)
-            if not domain_valid:
-                return False
-            
-            # 불필요한 이미지 패턴 제외
-            if any(pattern in url_lower for pattern in invalid_patterns):
-                return False
-            
-            # 이미지 확장자 확인
-            valid_extensions = ['.jpg', '.jpeg', '.png', '.webp']
-            if not any(ext in url_lower for ext in valid_extensions):
-                return False
-            
-            # 최소 크기 확인 (작은 아이콘 제외)
-            if any(size in url_lower for size in ['16x16', '32x32', '50x50']):
-                return False
-            
-            return True
-            
-        except Exception:
-            return False
+            result = self.driver.execute_script(self.EXTRACT_IMAGE_CANDIDATES_SCRIPT, list(selectors))
+            hits = dict(zip(selectors, result.get('hits', [])))
+            return result.get('urls', []), hits
+        except Exception as e:
+            print(f"이미지 후보 추출 오류: {e}")
+            return [], {}
+    
+    def collect_js_image_urls(self):
+        """현재 DOM의 상품 이미지 URL 수집 (고해상도 변환 적용)"""
+        candidate_urls, _ = self.extract_image_candidates()
+        return self.url_rules.normalize_batch(candidate_urls)
+    
+    def emit_image_url(self, url):
+        """스트리밍 파이프라인이 동작 중이면 URL을 다운로드 단계로 전달"""
+        if self.url_feed is not None:
+            self.url_feed.put(url)
+    
+    def is_valid_product_image(self, url):
+        """유효한 상품 이미지 URL인지 확인 (컴파일된 규칙, URL별 결과 캐시)"""
+        return self.url_rules.is_product_image(url)
     
     def convert_to_high_resolution(self, url):
         """이미지를 고해상도 버전으로 변환"""
-        try:
-            # 무신사 이미지 URL 패턴에 따른 고해상도 변환
-            conversions = {
-                '/thumb/': '/large/',
-                '/small/': '/origin/',
-                '_thumb': '_large',
-                '_small': '_origin',
-                '/150/': '/500/',
-                '/300/': '/800/',
-                '_150.': '_500.',
-                '_300.': '_800.'
-            }
-            
-            high_res_url = url
-            for old, new in conversions.items():
-                if old in url:
-                    high_res_url = url.replace(old, new)
-                    break
-            
-            return high_res_url
-            
-        except Exception:
-            return url
+        return self.url_rules.to_high_resolution(url)
     
-    def download_images_with_progress(self, image_urls):
-        """진행률 표시와 함께 이미지 다운로드"""
-        if not image_urls:
-            print("다운로드할 이미지가 없습니다.")
-            return 0
+    def download_images_with_progress(self, image_urls, merge_existing=False):
+        """진행률 표시와 함께 이미지 다운로드 (동시 다운로드, 실패 시 백오프 재시도)
         
-        print(f"{len(image_urls)}개 이미지 다운로드 시작...")
+        image_urls는 URL 목록 또는 추출 단계가 채우는 UrlFeed입니다.
+        UrlFeed면 전체 개수를 모르는 상태로 URL이 도착하는 대로 다운로드합니다.
+        URL은 DownloadScheduler를 거쳐 download_priority 정책 순서로 시작하며,
+        max_images와 download_byte_budget_mb는 그 순서대로 적용됩니다.
+        이미 받은 이미지는 시작할 때 한 번 읽은 DownloadIndex로 판단하여 작업을 만들지 않고 건너뜁니다.
+        한도로 제외했거나 일시적 오류로 실패한 URL은 CrawlState에 남겨 다음 증분 실행에서 다시 받습니다.
+        """
+        max_images = self.config.get("max_images", 1000)
+        if isinstance(image_urls, UrlFeed):
+            feed = image_urls
+            total = '?'
+        else:
+            if not image_urls:
+                print("다운로드할 이미지가 없습니다.")
+                return 0
+            feed = UrlFeed.from_list(image_urls)
+            total = min(len(image_urls), max_images) if max_images is not None else len(image_urls)
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0',
-            'Referer': 'https://www.musinsa.com/',
-            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8'
-        }
+        max_workers = max(1, int(self.config.get("download_workers", 8)))
+        max_in_flight = max_workers * 2
+        scheduler = self.create_download_scheduler(streaming=total == '?', window=max_in_flight * 2)
+        if total == '?':
+            print(f"이미지 다운로드 시작... (추출과 동시 진행, 동시 다운로드 {max_workers}개)")
+        else:
+            print(f"{total}개 이미지 다운로드 시작... (동시 다운로드 {max_workers}개)")
+        
+        host_limiter = HostConcurrencyLimiter(self.config.get("per_host_concurrency", 4))
+        
+        retry_queue = RetryQueue(
+            max_attempts=self.config.get("download_max_attempts", 4),
+            base_delay=self.config.get("retry_base_delay", 1.0),
+            max_delay=self.config.get("retry_max_delay", 60.0)
+        )
+        
+        # 건너뛰기 판단용 색인 (파일마다 stat하지 않음)
+        download_index = DownloadIndex.load(self.download_folder)
+        recorded_files = set()
         
         downloaded_count = 0
+        skipped_count = 0
         failed_count = 0
+        rejected_count = 0
+        retried_count = 0
         download_info = []
+        failures = []
         
-        for i, url in enumerate(image_urls, 1):
-            try:
-                filename = self.generate_filename(url, i)
-                filepath = os.path.join(self.download_folder, filename)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pending = {}
+        submitted_count = 0
+        feed_done = False
+        
+        def submit(i, url):
+            retry_queue.record_attempt(url)
+            scheduler.reserve(url)
+            future = executor.submit(self.download_single_image, i, url, total, host_limiter)
+            pending[future] = (i, url)
+        
+        try:
+            # 피드가 끝나고 진행 중인 작업, 재시도 대기열, 스케줄러가 모두 빌 때까지 처리
+            while not feed_done or pending or retry_queue or scheduler:
+                if self.stop_event.is_set():
+                    break
                 
-                # 이미 존재하는 파일 확인
-                if os.path.exists(filepath):
-                    file_size = os.path.getsize(filepath)
-                    if file_size > 1024:  # 1KB 이상이면 유효한 파일로 간주
-                        print(f"[{i:3d}/{len(image_urls)}] 건너뛰기: {filename}")
+                for i, url in retry_queue.pop_ready():
+                    submit(i, url)
+                
+                # 스케줄러 대기 범위만큼 피드에서 가져와 우선순위 순으로 정렬 (나머지는 피드에서 대기)
+                while not feed_done and scheduler.wants_more():
+                    # 시작할 수 있는 일이 있으면 피드를 기다리지 않고, 재시도 시각이 되면 대기를 멈춤
+                    ready = pending or (scheduler and not scheduler.is_holding())
+                    timeout = 0 if ready else 0.5
+                    if retry_queue:
+                        timeout = min(timeout, retry_queue.time_until_next())
+                    try:
+                        url = feed.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if url is None:
+                        feed_done = True
+                        scheduler.close()
+                        break
+                    scheduler.push(url)
+                
+                # 작업 스레드가 놀지 않을 만큼만 우선순위가 높은 URL부터 시작
+                while len(pending) < max_in_flight:
+                    url = scheduler.pop()
+                    if url is None:
+                        break
+                    submitted_count += 1
+                    
+                    # 이미 받은 이미지는 매니페스트 항목을 그대로 유지 (재실행 시 아무것도 받지 않음)
+                    existing = download_index.lookup(url, self.generate_filename(url))
+                    if existing:
+                        skipped_count += 1
+                        if existing['filename'] not in recorded_files:
+                            recorded_files.add(existing['filename'])
+                            download_info.append(dict(existing, index=submitted_count))
+                        print(f"[{submitted_count:3d}/{total}] 건너뛰기: {existing['filename']}")
                         continue
+                    submit(submitted_count, url)
                 
-                # 이미지 다운로드
-                response = requests.get(url, headers=headers, timeout=15, stream=True)
-                response.raise_for_status()
+                if not pending:
+                    # 피드를 기다리는 중이 아닐 때만 다음 재시도 시각까지 대기
+                    if retry_queue and (feed_done or not scheduler.wants_more()):
+                        time.sleep(retry_queue.time_until_next())
+                    continue
                 
-                # Content-Type 확인
-                content_type = response.headers.get('content-type', '')
-                if not content_type.startswith('image/'):
-                    print(f"[{i:3d}/{len(image_urls)}] 이미지가 아님: {filename}")
+                timeout = retry_queue.time_until_next()
+                if not feed_done:
+                    timeout = 0.2 if timeout is None else min(timeout, 0.2)
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, url = pending.pop(future)
+                    status, info = future.result()
+                    network_bytes = info['size'] if status == 'downloaded' and info['source'] == 'network' else 0
+                    scheduler.release(url, network_bytes)
+                    
+                    if status == 'downloaded':
+                        downloaded_count += 1
+                        download_info.append(info)
+                        self.crawl_state.record_image(info['url'], info['filename'], self.download_folder,
+                                                      info['sha256'], info['size'])
+                        continue
+                    if status != 'failed' and status != 'rejected':
+                        continue
+                    
+                    # 일시적 오류는 백오프 후 재시도, 영구 오류나 시도 횟수 초과는 실패로 기록
+                    if info['retryable'] and not self.stop_event.is_set():
+                        delay = retry_queue.schedule(url, (i, url), info.get('retry_after'))
+                        if delay is not False:
+                            retried_count += 1
+                            print(f"[{i:3d}/{total}] 재시도 예약 "
+                                  f"({retry_queue.attempts[url]}/{retry_queue.max_attempts}, {delay:.1f}초 후)")
+                            continue
+                    
                     failed_count += 1
-                    continue
+                    if status == 'rejected':
+                        rejected_count += 1
+                    info['attempts'] = retry_queue.attempts[url]
+                    failures.append(info)
+                    # 사용자 중단이 아니면 이어받을 일이 없으므로 .part 정리
+                    if not self.stop_event.is_set():
+                        self.discard_part_files(url)
+        except KeyboardInterrupt:
+            # 대기 중인 작업 취소, 진행 중인 작업은 .part 파일을 남기고 중단
+            self.stop_event.set()
+            raise
+        finally:
+            if self.stop_event.is_set():
+                feed.cancel()
+                for future in pending:
+                    future.cancel()
+            executor.shutdown(wait=True)
+            if self.http_cache:
+                self.http_cache.save_index()
+            if self.resolution_prober:
+                self.resolution_prober.save()
+            if not self.stop_event.is_set():
+                self.crawl_state.record_pending_urls(
+                    scheduler.dropped + [item['url'] for item in failures if item['retryable']])
+                self.crawl_state.forget_pending_urls(
+                    [item['url'] for item in failures if not item['retryable']])
+            self.crawl_state.commit()
+        
+        # 입력 순서대로 정렬하여 기록
+        for records in (download_info, failures):
+            records.sort(key=lambda item: item['index'])
+            for item in records:
+                del item['index']
+        
+        # 다운로드 정보 저장 (최종 실패 목록 포함)
+        self.save_download_info(download_info, failures, merge_existing)
+        
+        print(f"\n=== 다운로드 완료 ===")
+        print(f"성공: {downloaded_count}개")
+        print(f"이미 받은 이미지 건너뜀: {skipped_count}개")
+        print(f"실패: {failed_count}개 (본문 수신 전 조기 거부 {rejected_count}개 포함)")
+        print(f"재시도: {retried_count}회")
+        print(f"전체: {submitted_count}개")
+        schedule_stats = scheduler.stats
+        if schedule_stats['dropped_max_items'] or schedule_stats['dropped_byte_budget']:
+            print(f"우선순위({self.get_download_priority_policy()})에 따라 제외: "
+                  f"최대 이미지 수 초과 {schedule_stats['dropped_max_items']}개, "
+                  f"용량 예산 초과 {schedule_stats['dropped_byte_budget']}개 "
+                  f"(받은 용량 {scheduler.bytes_used:,} bytes)")
+        self.log_session(f"다운로드 스케줄러({self.get_download_priority_policy()}): {schedule_stats}, "
+                         f"받은 용량 {scheduler.bytes_used} bytes")
+        self.log_session(f"다운로드: 성공 {downloaded_count}개, 건너뜀 {skipped_count}개, 실패 {failed_count}개")
+        
+        conn_stats = get_connection_stats(self.http_session)
+        print(f"HTTP 요청: {conn_stats['requests']}회, "
+              f"새 연결: {conn_stats['new_connections']}개, "
+              f"재사용: {conn_stats['reused_connections']}회")
+        self.log_session(f"연결 재사용 통계: {conn_stats}")
+        self.log_session(f"최종 다운로드 속도(req/s): {self.rate_limiter.current_rates()}")
+        
+        if self.http_cache:
+            cache_stats = self.http_cache.stats
+            print(f"HTTP 캐시: 재검증 없이 사용 {cache_stats['fresh_hits']}개, "
+                  f"재검증(304) {cache_stats['revalidated']}개, "
+                  f"새로 받음 {cache_stats['misses']}개")
+            self.log_session(f"HTTP 캐시 통계: {cache_stats}")
+        
+        if self.content_store:
+            store_stats = self.content_store.stats
+            print(f"내용 저장소: 새로 저장 {store_stats['stored']}개, "
+                  f"중복 제거 {store_stats['deduplicated']}개 ({store_stats['bytes_saved']:,} bytes 절약)")
+            self.log_session(f"내용 저장소 통계: {store_stats}")
+        
+        if self.resolution_prober:
+            probe_stats = self.resolution_prober.stats
+            print(f"해상도 확인: 기억한 변환 사용 {probe_stats['learned']}개, "
+                  f"새로 확인 {probe_stats['probed']}개 (요청 {probe_stats['probe_requests']}회), "
+                  f"확인 실패 {probe_stats['unresolved']}개")
+            self.log_session(f"해상도 확인 통계: {probe_stats}")
+        
+        return downloaded_count
+    
+    def discard_part_files(self, url):
+        """최종 실패한 URL(해상도 후보 포함)의 .part 파일 삭제
+        
+        남겨 두면 find_incomplete_run_folder가 이 폴더를 중단된 실행으로 보고 계속 재사용합니다.
+        """
+        _, candidates = self.url_rules.resolution_candidates(url)
+        for candidate_url in {url, *(candidate for _, candidate in candidates)}:
+            part_path = get_part_path(self.download_folder, candidate_url)
+            try:
+                os.remove(part_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"임시 파일 삭제 실패: {part_path} ({e})")
+    
+    def get_download_priority_policy(self):
+        """설정된 다운로드 우선순위 정책 (알 수 없는 값이면 newest)"""
+        policy = self.config.get("download_priority", "newest")
+        if policy not in self.DOWNLOAD_PRIORITY_POLICIES:
+            print(f"알 수 없는 download_priority: {policy} (newest 사용)")
+            self.config["download_priority"] = policy = "newest"
+        return policy
+    
+    def download_priority(self, url):
+        """정책에 따른 URL 우선순위 키 (작을수록 먼저 다운로드)
+        
+        newest: 구매 내역에서 먼저(최근 주문 쪽에서) 발견된 이미지 우선
+        highest_resolution / smallest: URL의 크기 표시(origin, 500, thumb 등)와 요청 너비로 비교
+        fifo: 들어온 순서 그대로
+        """
+        policy = self.get_download_priority_policy()
+        if policy == "newest":
+            return self.image_variants.position(url)
+        if policy == "highest_resolution":
+            return tuple(-value for value in self.url_rules.variant_rank(url))
+        if policy == "smallest":
+            return self.url_rules.variant_rank(url)
+        return ()
+    
+    def create_download_scheduler(self, streaming, window):
+        """다운로드 대기열 스케줄러 생성
+        
+        스트리밍 중에는 window만큼만 모아 정렬합니다. 크기 기준 정책에 max_images나 용량 예산이 있으면
+        이미 시작한 다운로드는 되돌릴 수 없으므로, 전체 중 우선순위가 높은 이미지에 한도를 쓰도록
+        추출이 끝날 때까지 다운로드를 시작하지 않고 모읍니다 (추출과 다운로드가 겹치지 않음).
+        newest는 구매 내역을 최근 주문부터 탐색하므로 도착 순서와 거의 같아 모으지 않습니다.
+        """
+        policy = self.get_download_priority_policy()
+        max_images = self.config.get("max_images", 1000)
+        budget_mb = self.config.get("download_byte_budget_mb", 0)
+        byte_budget = int(budget_mb * 1024 * 1024) if budget_mb else None
+        
+        defer = (streaming and policy in ("highest_resolution", "smallest")
+                 and (max_images is not None or bool(byte_budget)))
+        if defer:
+            print(f"우선순위 정책 {policy}: max_images·용량 예산을 우선순위 순으로 적용하기 위해 "
+                  f"추출이 끝난 뒤 다운로드를 시작합니다. (추출과 다운로드 동시 진행 안 함)")
+        return DownloadScheduler(
+            priority_func=self.download_priority,
+            max_items=max_images,
+            byte_budget=byte_budget,
+            window=window if streaming else None,
+            defer=defer
+        )
+    
+    def download_single_image(self, i, url, total, host_limiter):
+        """단일 이미지 다운로드 (작업 스레드에서 실행)
+        
+        반환값: (상태, 다운로드 정보) - 상태는 'downloaded', 'rejected', 'failed' 중 하나
+        """
+        try:
+            filename = self.generate_filename(url)
+            filepath = os.path.join(self.download_folder, filename)
+            
+            # 해상도 후보를 확인해 실제로 받을 URL 결정 (같은 패턴은 기억한 변환을 바로 사용)
+            fetch_url = self.resolution_prober.resolve(url) if self.resolution_prober else url
+            
+            # 유효 기간 안의 캐시는 요청 없이 사용
+            cache_entry = self.http_cache.lookup(fetch_url) if self.http_cache else None
+            if cache_entry and self.http_cache.is_fresh(cache_entry):
+                file_size = self.http_cache.materialize(cache_entry, filepath)
+                self.http_cache.record('fresh_hits')
+                print(f"[{i:3d}/{total}] 캐시 사용: {filename} ({file_size:,} bytes)")
+                return 'downloaded', self.build_download_info(
+                    i, filename, url, file_size, 'cache', cache_entry['digest'], fetch_url)
+            
+            part_path = get_part_path(self.download_folder, fetch_url)
+            request_headers, resume_from = build_range_headers(part_path)
+            if cache_entry and not resume_from:
+                request_headers.update(self.http_cache.conditional_headers(cache_entry))
+            
+            self.rate_limiter.acquire(fetch_url)
+            
+            with host_limiter.slot(fetch_url):
+                # 이미지 다운로드 (.part 파일이 있으면 이어받기, 캐시가 있으면 조건부 요청)
+                response = self.http_session.get(fetch_url, headers=request_headers, timeout=15, stream=True)
                 
-                # 파일 저장
-                with open(filepath, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
+                # 요청 제한 응답이면 속도 감소
+                if response.status_code in AdaptiveRateLimiter.THROTTLE_STATUS_CODES:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    self.rate_limiter.record_throttled(fetch_url, retry_after)
+                    response.close()
+                    print(f"[{i:3d}/{total}] 요청 제한 ({response.status_code}): {filename}")
+                    return 'failed', self.build_failure_info(
+                        i, url, f"HTTP {response.status_code}", True, retry_after)
                 
-                file_size = os.path.getsize(filepath)
+                # 변경 없음(304)이면 캐시 본문 사용
+                if response.status_code == 304 and cache_entry:
+                    response.close()
+                    self.rate_limiter.record_success(fetch_url)
+                    self.http_cache.refresh(fetch_url, response.headers)
+                    self.http_cache.record('revalidated')
+                    file_size = self.http_cache.materialize(cache_entry, filepath)
+                    print(f"[{i:3d}/{total}] 캐시 재검증: {filename} ({file_size:,} bytes)")
+                    return 'downloaded', self.build_download_info(
+                        i, filename, url, file_size, 'cache', cache_entry['digest'], fetch_url)
                 
-                # 품질 필터링
-                if self.config.get("image_quality_filter", True) and file_size < 5120:  # 5KB 미만
-                    os.remove(filepath)
-                    print(f"[{i:3d}/{len(image_urls)}] 품질 낮음: {filename}")
-                    failed_count += 1
-                    continue
+                # 이어받기 범위가 잘못되면 처음부터 다시 받기
+                if response.status_code == 416:
+                    response.close()
+                    os.remove(part_path)
+                    resume_from = 0
+                    self.rate_limiter.acquire(fetch_url)
+                    response = self.http_session.get(fetch_url, timeout=15, stream=True)
                 
-                downloaded_count += 1
-                download_info.append({
-                    'filename': filename,
-                    'url': url,
-                    'size': file_size,
-                    'timestamp': datetime.now().isoformat()
-                })
+                # 기억한 해상도 변환이 이 URL에는 통하지 않으면 잊고 다시 확인하도록 재시도
+                if response.status_code == 404 and fetch_url != url and self.resolution_prober:
+                    response.close()
+                    self.resolution_prober.forget(url)
+                    print(f"[{i:3d}/{total}] 변환한 해상도 URL 없음: {filename}")
+                    return 'failed', self.build_failure_info(i, url, "변환한 해상도 URL 없음 (HTTP 404)", True)
                 
-                print(f"[{i:3d}/{len(image_urls)}] 완료: {filename} ({file_size:,} bytes)")
+                response.raise_for_status()
+                self.rate_limiter.record_success(fetch_url)
                 
-                # 다운로드 지연
-                time.sleep(self.config.get("download_delay", 0.5))
+                # Content-Type 확인
+                content_type = response.headers.get('content-type', '')
+                if not content_type.startswith('image/'):
+                    response.close()
+                    print(f"[{i:3d}/{total}] 이미지가 아님: {filename}")
+                    return 'failed', self.build_failure_info(i, url, f"이미지가 아님 ({content_type})", False)
                 
-            except requests.exceptions.RequestException as e:
-                print(f"[{i:3d}/{len(image_urls)}] 네트워크 오류: {e}")
-                failed_count += 1
-                continue
+                # 서버가 Range를 무시하면(200) 처음부터 기록
+                resumed = resume_from > 0 and response.status_code == 206
+                if resumed:
+                    print(f"[{i:3d}/{total}] 이어받기: {filename} ({resume_from:,} bytes부터)")
+                expected_length = get_expected_length(response, resume_from if resumed else 0)
                 
-            except Exception as e:
-                print(f"[{i:3d}/{len(image_urls)}] 다운로드 실패: {e}")
-                failed_count += 1
-                continue
-        
-        # 다운로드 정보 저장
-        self.save_download_info(download_info)
-        
-        print(f"\n=== 다운로드 완료 ===")
-        print(f"성공: {downloaded_count}개")
-        print(f"실패: {failed_count}개")
-        print(f"전체: {len(image_urls)}개")
+                # 본문을 쓰기 전에 Content-Length와 헤더 바이트로 아이콘/비이미지 조기 거부
+                prefix = b''
+                if not resumed:
+                    quality_filter = self.config.get("image_quality_filter", True)
+                    try:
+                        prefix = inspect_image_stream(
+                            response,
+                            min_bytes=5120 if quality_filter else 0,
+                            min_dimension=self.config.get("min_image_dimension", 100) if quality_filter else 0
+                        )
+                    except ImageRejected as e:
+                        response.close()
+                        print(f"[{i:3d}/{total}] 조기 거부 ({e}): {filename}")
+                        return 'rejected', self.build_failure_info(i, url, f"조기 거부 ({e})", False)
+                
+                # .part 파일에 저장하면서 해시 계산 후 길이 검증
+                hasher = hashlib.sha256()
+                stream_to_part_file(response, part_path, append=resumed, stop_event=self.stop_event,
+                                    hasher=hasher, prefix=prefix)
+                file_size = verify_part_file(part_path, expected_length)
+            
+            # 품질 필터링 (최종 파일을 만들기 전에 판단)
+            if self.config.get("image_quality_filter", True) and file_size < 5120:  # 5KB 미만
+                os.remove(part_path)
+                print(f"[{i:3d}/{total}] 품질 낮음: {filename}")
+                return 'rejected', self.build_failure_info(i, url, "품질 낮음", False)
+            
+            digest = hasher.hexdigest()
+            if self.content_store:
+                # 같은 내용은 저장소에 한 번만 저장하고 실행 폴더에는 하드링크
+                self.content_store.add_file(part_path, digest)
+                self.content_store.link_into(digest, filepath)
+            else:
+                os.replace(part_path, filepath)
+            
+            # 다음 실행에서 재검증할 수 있도록 캐시에 기록
+            if self.http_cache:
+                self.http_cache.store(fetch_url, digest, file_size, response.headers)
+                self.http_cache.record('misses')
+            
+            print(f"[{i:3d}/{total}] 완료: {filename} ({file_size:,} bytes)")
+            
+            return 'downloaded', self.build_download_info(i, filename, url, file_size, 'network', digest, fetch_url)
+            
+        except DownloadCancelled:
+            print(f"[{i:3d}/{total}] 중단됨 (다음 실행에서 이어받기): {url}")
+            return 'failed', self.build_failure_info(i, url, "사용자 중단", True)
+            
+        except Exception as e:
+            reason, retryable = classify_download_error(e)
+            print(f"[{i:3d}/{total}] {reason}: {url}")
+            return 'failed', self.build_failure_info(i, url, reason, retryable)
+    
+    def build_download_info(self, i, filename, url, file_size, source, digest, fetch_url=None):
+        """download_info 항목 생성 (source: 'network' 또는 'cache')
         
-        return downloaded_count
+        해상도 확인으로 다른 URL에서 받았으면 resolved_url에 기록합니다.
+        """
+        info = {
+            'index': i,
+            'filename': filename,
+            'url': url,
+            'size': file_size,
+            'sha256': digest,
+            'source': source,
+            'timestamp': datetime.now().isoformat()
+        }
+        if fetch_url and fetch_url != url:
+            info['resolved_url'] = fetch_url
+        return info
+    
+    def build_failure_info(self, i, url, reason, retryable, retry_after=None):
+        """실패 보고서 항목 생성"""
+        return {
+            'index': i,
+            'url': url,
+            'reason': reason,
+            'retryable': retryable,
+            'retry_after': retry_after,
+            'timestamp': datetime.now().isoformat()
+        }
     
-    def generate_filename(self, url, index):
-        """고급 파일명 생성"""
+    def on_rate_change(self, host, old_rate, new_rate, reason):
+        """속도 제한 변경을 세션 로그에 기록"""
+        message = f"다운로드 속도 조정 [{host}]: {old_rate:.1f} → {new_rate:.1f} req/s ({reason})"
+        if reason == 'throttled':
+            print(message)
+        self.log_session(message)
+    
+    def generate_filename(self, url):
+        """고급 파일명 생성
+        
+        순번 대신 이미지 정체성(canonical_key) 해시를 붙이고, 이름의 나머지 부분도 크기 표시를
+        뺀 정체성 키 경로에서 만들므로 같은 이미지는 실행 순서나 크기 변형과 관계없이 항상 같은 파일명이 됩니다.
+        """
+        canonical_key = self.url_rules.canonical_key(url)
+        key_hash = hashlib.sha1(canonical_key.encode('utf-8')).hexdigest()[:10]
         try:
-            parsed_url = urlparse(url)
-            original_name = os.path.basename(parsed_url.path)
+            # 정체성 키는 '호스트/경로' 형태이며 크기 표시는 '*'로 바뀌어 있음 (예: abc_*.jpg → abc.jpg)
+            path_parts = canonical_key.split('?', 1)[0].split('/')[1:]
+            original_name = re.sub(r'[_\-.]?\*', '', path_parts[-1]) if path_parts else ''
+            if original_name.startswith('.'):
+                original_name = ''
             
-            # URL에서 상품 ID나 브랜드 정보 추출 시도
-            path_parts = parsed_url.path.split('/')
+            # URL 디렉터리 경로에서 상품 ID나 브랜드 정보 추출 시도 (크기 표시 디렉터리는 제외)
             brand_info = ""
             product_id = ""
             
-            for part in path_parts:
+            for part in path_parts[:-1]:
+                if '*' in part:
+                    continue
                 if part.isdigit() and len(part) >= 6:  # 상품 ID로 추정
                     product_id = part
                 elif part and not part.isdigit() and len(part) > 2:  # 브랜드명으로 추정
@@ -795,7 +1911,7 @@ class AdvancedMusinsaCrawlerFirefox:
             
             # 확장자 결정
             if original_name and '.' in original_name:
-                name, ext = os.path.splitext(original_name)
+                ext = os.path.splitext(original_name)[1]
             else:
                 ext = '.jpg'  # 기본 확장자
                 if 'webp' in url.lower():
@@ -805,13 +1921,13 @@ class AdvancedMusinsaCrawlerFirefox:
             
             # 파일명 조합
             if product_id and brand_info:
-                filename = f"musinsa_{brand_info}_{product_id}_{index:03d}{ext}"
+                filename = f"musinsa_{brand_info}_{product_id}_{key_hash}{ext}"
             elif product_id:
-                filename = f"musinsa_product_{product_id}_{index:03d}{ext}"
+                filename = f"musinsa_product_{product_id}_{key_hash}{ext}"
             elif original_name:
-                filename = f"musinsa_{index:03d}_{original_name}"
+                filename = f"musinsa_{key_hash}_{original_name}"
             else:
-                filename = f"musinsa_image_{index:03d}{ext}"
+                filename = f"musinsa_image_{key_hash}{ext}"
             
             # 파일명 정리
             filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
@@ -820,19 +1936,36 @@ class AdvancedMusinsaCrawlerFirefox:
             return filename
             
         except Exception:
-            return f"musinsa_image_{index:03d}.jpg"
+            return f"musinsa_image_{key_hash}.jpg"
     
-    def save_download_info(self, download_info):
-        """다운로드 정보를 JSON 파일로 저장"""
+    def save_download_info(self, download_info, failures=None, merge_existing=False):
+        """다운로드 정보를 JSON 파일로 저장
+        
+        merge_existing=True면 기존 파일의 성공 목록에 이번 결과를 합치고,
+        실패 목록은 이번에 성공하거나 다시 실패한 URL만 갱신합니다.
+        """
         try:
             info_file = os.path.join(self.download_folder, "download_info.json")
+            failures = failures or []
+            
+            images = download_info
+            if merge_existing:
+                previous = self.load_download_info() or {}
+                new_urls = {item['url'] for item in download_info}
+                images = [item for item in previous.get('images', []) if item['url'] not in new_urls]
+                images.extend(download_info)
+                handled_urls = new_urls | {item['url'] for item in failures}
+                failures = [item for item in previous.get('failed_images', [])
+                            if item['url'] not in handled_urls] + failures
             
             summary = {
                 'download_date': datetime.now().isoformat(),
-                'total_images': len(download_info),
-                'total_size_bytes': sum(item['size'] for item in download_info),
+                'total_images': len(images),
+                'total_size_bytes': sum(item['size'] for item in images),
                 'config_used': self.config,
-                'images': download_info
+                'images': images,
+                'failed_count': len(failures),
+                'failed_images': failures
             }
             
             with open(info_file, 'w', encoding='utf-8') as f:
@@ -843,6 +1976,18 @@ class AdvancedMusinsaCrawlerFirefox:
         except Exception as e:
             print(f"다운로드 정보 저장 실패: {e}")
     
+    def load_download_info(self):
+        """실행 폴더의 download_info.json 로드"""
+        info_file = os.path.join(self.download_folder, "download_info.json")
+        if not os.path.exists(info_file):
+            return None
+        try:
+            with open(info_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"다운로드 정보 로드 실패: {e}")
+            return None
+    
     def log_session(self, message):
         """세션 로그 기록"""
         log_entry = {
@@ -853,6 +1998,19 @@ class AdvancedMusinsaCrawlerFirefox:
     
     def save_session_log(self):
         """세션 로그 저장"""
+        variant_stats = self.image_variants.stats
+        self.log_session(f"이미지 변형 통합: 한 번에 추출한 목록 안에서 {self.url_rules.stats['collapsed']}개, "
+                         f"페이지·추출 단계 간 {variant_stats['collapsed']}개 "
+                         f"(더 큰 변형으로 교체 {variant_stats['upgraded']}개), "
+                         f"고유 이미지 {len(self.image_variants)}개")
+        if self.selector_cache is not None:
+            stats = self.selector_cache.stats
+            self.log_session(f"셀렉터 캐시: 적중 {stats['hits']}회, 미스 {stats['misses']}회, 강등 {stats['demoted']}회")
+            try:
+                self.selector_cache.save()
+            except Exception as e:
+                print(f"셀렉터 캐시 저장 실패: {e}")
+        
         try:
             log_file = os.path.join(self.download_folder, "session_log.json")
             with open(log_file, 'w', encoding='utf-8') as f:
@@ -868,30 +2026,64 @@ class AdvancedMusinsaCrawlerFirefox:
             
             self.log_session("크롤링 시작")
             
-            # 1. 로그인
-            if not self.login_with_retry(username, password):
+            # 1. 로그인 (저장된 세션이 유효하면 폼 로그인 생략)
+            if not self.login(username, password):
                 self.log_session("로그인 실패")
                 return False
             
-            # 2. 구매 내역 페이지 이동 및 모든 페이지 로드
-            if not self.navigate_to_order_history_with_pagination():
-                self.log_session("구매 내역 페이지 로드 실패")
-                return False
-            
-            # 3. 고급 이미지 추출
-            image_urls = self.extract_product_images_advanced()
-            
-            if not image_urls:
-                print("추출된 이미지가 없습니다.")
-                self.log_session("이미지 추출 실패 - 이미지 없음")
-                return False
-            
-            self.log_session(f"{len(image_urls)}개 이미지 URL 추출 완료")
-            
-            # 4. 이미지 다운로드
-            downloaded_count = self.download_images_with_progress(image_urls)
+            browserless = self.config.get("browserless_mode", False)
+            sharded = self.config.get("sharded_crawl", False)
+            if (self.config.get("streaming_pipeline", True) or sharded) and not browserless:
+                # 2~4. 페이지 탐색·추출과 다운로드를 동시에 진행 (샤드 모드면 여러 브라우저가 나눠 탐색)
+                producer = self.crawl_order_pages_sharded if sharded else None
+                loaded, accepted_count, downloaded_count = self.run_streaming_pipeline(producer)
+                if not loaded:
+                    self.log_session("구매 내역 페이지 로드 실패")
+                    return False
+                if accepted_count == 0 and self.config.get("incremental_mode", False):
+                    print("새로 다운로드할 이미지가 없습니다.")
+                    self.crawl_state.mark_orders_seen(self.collected_order_ids)
+                    return True
+            else:
+                if browserless:
+                    # 2~3. 브라우저 조작 없이 구매 내역 JSON 엔드포인트에서 이미지 URL 수집
+                    image_urls = self.collect_image_urls_from_api()
+                    if image_urls is None:
+                        self.log_session("구매 내역 API 호출 실패")
+                        return False
+                else:
+                    # 2. 구매 내역 페이지 이동 및 모든 페이지 로드
+                    if not self.navigate_to_order_history_with_pagination():
+                        self.log_session("구매 내역 페이지 로드 실패")
+                        return False
+                    
+                    # 3. 고급 이미지 추출
+                    image_urls = self.extract_product_images_advanced()
+                
+                if not image_urls:
+                    print("추출된 이미지가 없습니다.")
+                    self.log_session("이미지 추출 실패 - 이미지 없음")
+                    return False
+                
+                self.log_session(f"{len(image_urls)}개 이미지 URL 추출 완료")
+                
+                # 증분 모드: 이전 실행에서 받은 URL 제외, 받지 못하고 남겨 둔 URL 추가
+                if self.config.get("incremental_mode", False):
+                    is_new_image = self.build_incremental_filter()
+                    image_urls = [url for url in self.with_pending_urls(image_urls) if is_new_image(url)]
+                    self.log_session(f"증분 모드: 새 이미지 URL {len(image_urls)}개")
+                    if not image_urls:
+                        print("새로 다운로드할 이미지가 없습니다.")
+                        self.crawl_state.mark_orders_seen(self.collected_order_ids)
+                        return True
+                
+                # 4. 이미지 다운로드
+                downloaded_count = self.download_images_with_progress(image_urls)
             
             if downloaded_count > 0:
+                # 다운로드가 끝난 뒤에 주문을 기록해야 중단 시 다음 실행에서 다시 탐색함
+                # (한도나 일시적 오류로 받지 못한 URL은 CrawlState에 남겨 두었으므로 다음 증분 실행에서 받음)
+                self.crawl_state.mark_orders_seen(self.collected_order_ids)
                 self.log_session(f"다운로드 완료: {downloaded_count}개 이미지")
                 print(f"\n=== 크롤링 성공 완료 ===")
                 print(f"저장 위치: {self.download_folder}")
@@ -915,13 +2107,354 @@ class AdvancedMusinsaCrawlerFirefox:
             self.save_session_log()
             self.close()
     
+    def build_incremental_filter(self):
+        """증분 모드용 URL 필터 (이전 실행에서 받은 이미지면 False)
+        
+        canonical_key로 비교하므로 같은 이미지의 다른 크기·쿼리 변형도 받은 것으로 봅니다.
+        """
+        canonical_key = self.url_rules.canonical_key
+        downloaded_keys = {canonical_key(url) for url in self.crawl_state.downloaded_urls()}
+        return lambda url: canonical_key(url) not in downloaded_keys
+    
+    def with_pending_urls(self, image_urls):
+        """이전 실행에서 한도나 일시적 오류로 받지 못한 URL을 목록 뒤에 추가 (같은 이미지는 한 번만)
+        
+        증분 모드는 이미 본 주문에서 탐색을 멈추므로, 남겨 둔 URL은 다시 추출되지 않아 여기서 이어 받습니다.
+        """
+        canonical_key = self.url_rules.canonical_key
+        keys = {canonical_key(url) for url in image_urls}
+        pending = []
+        for url in self.crawl_state.pending_urls():
+            key = canonical_key(url)
+            if key not in keys:
+                keys.add(key)
+                pending.append(url)
+        if pending:
+            print(f"이전 실행에서 받지 못한 이미지 {len(pending)}개를 이어서 받습니다.")
+            self.log_session(f"증분 모드: 이전 실행에서 남겨 둔 URL {len(pending)}개 추가")
+        return list(image_urls) + pending
+    
+    def run_streaming_pipeline(self, producer=None):
+        """페이지 탐색·이미지 추출(생산자)과 다운로드(소비자)를 동시에 실행
+        
+        브라우저 조작은 메인 스레드에서, 다운로드는 별도 스레드에서 UrlFeed를 소비합니다.
+        producer를 지정하면 기본 탐색 대신 실행하며, 구매 내역 로드 성공 여부를 반환해야 합니다.
+        반환값: (구매 내역 로드 성공 여부, 다운로드 대상 URL 수, 다운로드 성공 수)
+        """
+        url_filter = None
+        if self.config.get("incremental_mode", False):
+            url_filter = self.build_incremental_filter()
+        
+        # 최대 이미지 수는 다운로드 단계의 DownloadScheduler가 우선순위 순으로 적용
+        feed = UrlFeed(
+            maxsize=self.config.get("pipeline_queue_size", 200),
+            url_filter=url_filter,
+            key_func=self.url_rules.canonical_key
+        )
+        result = {'downloaded': 0}
+        
+        def consume():
+            try:
+                result['downloaded'] = self.download_images_with_progress(feed)
+            except Exception as e:
+                print(f"다운로드 단계 오류: {e}")
+                feed.cancel()
+        
+        consumer = threading.Thread(target=consume, name="download-consumer", daemon=True)
+        consumer.start()
+        self.url_feed = feed
+        loaded = False
+        
+        try:
+            if producer is not None:
+                loaded = producer()
+            else:
+                loaded = self.navigate_to_order_history_with_pagination()
+                if loaded:
+                    self.extract_product_images_advanced()
+            if loaded and url_filter:
+                # 이전 실행에서 받지 못하고 남겨 둔 URL (이미 전달한 이미지는 피드가 제외)
+                for url in self.with_pending_urls([]):
+                    feed.put(url)
+        except KeyboardInterrupt:
+            self.stop_event.set()
+            feed.cancel()
+            raise
+        finally:
+            # 추출 종료 표시 후 남은 다운로드 완료 대기
+            self.url_feed = None
+            feed.close()
+            while consumer.is_alive():
+                consumer.join(0.5)
+        
+        self.log_session(f"스트리밍 파이프라인: URL {feed.accepted}개 전달, {result['downloaded']}개 다운로드, "
+                         f"이미 전달한 이미지의 변형 {feed.collapsed}개 제외")
+        return loaded, feed.accepted, result['downloaded']
+    
+    def collect_image_urls_from_api(self):
+        """로그인 세션 쿠키로 구매 내역 JSON 엔드포인트를 페이지 단위로 호출하여 이미지 URL 수집
+        
+        로그인 후에는 브라우저가 필요 없으므로 먼저 종료합니다.
+        반환값: 이미지 URL 목록 (호출 실패 시 None)
+        """
+        if self._driver:
+            try:
+                self._driver.quit()
+                print("브라우저 종료 (이후 단계는 HTTP 요청만 사용)")
+            except Exception as e:
+                print(f"브라우저 종료 중 오류: {e}")
+            self.driver = None
+        
+        endpoint = create_endpoint(
+            self.config.get("order_api_handler", "musinsa"),
+            base_url=self.config.get("order_api_base_url", "https://www.musinsa.com"),
+            path=self.config.get("order_api_path", "/order-service/my/order/list"),
+            page_size=self.config.get("order_api_page_size", 20)
+        )
+        client = OrderHistoryClient(
+            self.http_session,
+            endpoint,
+            max_pages=self.config.get("order_api_max_pages", 200),
+            timeout=self.config.get("page_load_timeout", 30),
+            record_folder=self.config.get("order_api_record_folder") or None,
+            rate_limiter=self.rate_limiter
+        )
+        
+        incremental = self.config.get("incremental_mode", False)
+        max_images = self.config.get("max_images", 1000)
+        # 최근 주문 우선이면 한도를 채운 뒤의 (더 오래된) 페이지는 받을 필요가 없음
+        stop_at_max = self.get_download_priority_policy() in ("newest", "fifo")
+        start = time.monotonic()
+        
+        try:
+            for page, parsed in client.iter_pages():
+                order_ids = set(parsed['order_ids'])
+                new_order_ids = order_ids - self.collected_order_ids
+                self.collected_order_ids.update(new_order_ids)
+                
+                for high_res_url in self.url_rules.normalize_batch(parsed['image_urls']):
+                    self.image_variants.add(high_res_url, page)
+                
+                print(f"구매 내역 API {page}페이지: 주문 {len(new_order_ids)}개, 누적 이미지 {len(self.image_variants)}개")
+                
+                # 증분 모드: 이전 실행에서 본 주문이 나오면 더 오래된 페이지는 생략
+                if incremental and new_order_ids and self.crawl_state.has_seen_any_order(new_order_ids):
+                    print("이전 실행에서 본 주문에 도달하여 API 탐색을 종료합니다.")
+                    break
+                if stop_at_max and len(self.image_variants) >= max_images:
+                    break
+        except (OrderApiError, requests.exceptions.RequestException) as e:
+            print(f"구매 내역 API 호출 실패: {e}")
+            return None
+        
+        image_urls = self.image_variants.urls()
+        elapsed = time.monotonic() - start
+        self.log_session(f"구매 내역 API: 주문 {len(self.collected_order_ids)}개, "
+                         f"이미지 URL {len(image_urls)}개 ({elapsed:.2f}초)")
+        return image_urls
+    
+    def crawl_order_pages_sharded(self):
+        """여러 헤드리스 Firefox가 구매 내역 페이지를 나눠 탐색하고 URL을 하나의 피드로 합침
+        
+        작업자는 공유 카운터에서 페이지 번호를 하나씩 가져가며, 주문이 없는 페이지(또는 증분 모드에서
+        이전에 본 주문)가 나오면 그 뒤 페이지는 더 이상 배정하지 않습니다.
+        반환값: 한 페이지 이상 로드했는지 여부
+        """
+        pool_size = self.get_shard_pool_size()
+        cookies = self.get_worker_cookies()
+        if not cookies:
+            print("샤드 작업자와 공유할 로그인 쿠키가 없습니다.")
+            return False
+        
+        # 로그인에 쓴 브라우저는 더 이상 필요 없으므로 메모리 확보를 위해 종료
+        if self._driver:
+            try:
+                self._driver.quit()
+            except Exception as e:
+                print(f"브라우저 종료 중 오류: {e}")
+            self.driver = None
+        
+        template = self.config.get("sharded_page_url_template",
+                                   "https://www.musinsa.com/order/order-list?page={page}")
+        incremental = self.config.get("incremental_mode", False)
+        lock = threading.Lock()
+        pages = {'next': 1, 'last': self.config.get("shard_max_pages", 200), 'loaded': 0}
+        
+        def claim_page():
+            with lock:
+                if self.stop_event.is_set() or pages['next'] > pages['last']:
+                    return None
+                page = pages['next']
+                pages['next'] += 1
+                return page
+        
+        def limit_pages(last_page):
+            with lock:
+                pages['last'] = min(pages['last'], last_page)
+        
+        def work(shard_id):
+            worker = self.spawn_shard_worker(shard_id, cookies)
+            try:
+                while True:
+                    page = claim_page()
+                    if page is None:
+                        break
+                    
+                    worker.open_page(template.format(page=page))
+                    worker.wait_for_dom_ready(f"샤드 {shard_id} 페이지 {page} DOM")
+                    worker.scroll_and_load_images()
+                    order_ids = set(worker.get_visible_order_ids())
+                    if not order_ids:
+                        # 마지막 페이지를 지남 (헤더·추천 상품 이미지는 남아 있으므로 주문 번호로만 판단)
+                        limit_pages(page - 1)
+                        continue
+                    
+                    image_urls = worker.collect_js_image_urls()
+                    image_urls.extend(worker.extract_background_images())
+                    
+                    with lock:
+                        new_order_ids = order_ids - self.collected_order_ids
+                        self.collected_order_ids.update(new_order_ids)
+                        pages['loaded'] += 1
+                    for image_url in image_urls:
+                        if self.image_variants.add(image_url, page) == 'new':
+                            self.emit_image_url(image_url)
+                    print(f"[샤드 {shard_id}] 페이지 {page}: 주문 {len(new_order_ids)}개, 이미지 URL {len(image_urls)}개")
+                    
+                    if incremental and new_order_ids and self.crawl_state.has_seen_any_order(new_order_ids):
+                        print(f"[샤드 {shard_id}] 이전에 수집한 주문에 도달하여 페이지 {page} 이후는 탐색하지 않습니다.")
+                        limit_pages(page)
+            finally:
+                if worker._driver:
+                    try:
+                        worker._driver.quit()
+                    except Exception:
+                        pass
+        
+        print(f"샤드 크롤링 시작: 헤드리스 Firefox {pool_size}개")
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="shard") as executor:
+            futures = [executor.submit(work, shard_id) for shard_id in range(1, pool_size + 1)]
+            try:
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"샤드 작업자 오류: {e}")
+            except KeyboardInterrupt:
+                # with 블록을 나가면 작업자 종료를 기다리므로, 그 전에 새 페이지 배정과 URL 전달을 멈춤
+                self.stop_event.set()
+                if self.url_feed is not None:
+                    self.url_feed.cancel()
+                raise
+        
+        elapsed = time.monotonic() - start
+        print(f"샤드 크롤링 완료: {pages['loaded']}페이지, 주문 {len(self.collected_order_ids)}개 ({elapsed:.1f}초)")
+        self.log_session(f"샤드 크롤링: 작업자 {pool_size}개, {pages['loaded']}페이지, {elapsed:.2f}초")
+        return pages['loaded'] > 0
+    
+    def spawn_shard_worker(self, shard_id, cookies):
+        """설정·HTTP 세션·URL 피드를 공유하고 자기 브라우저만 갖는 작업자 생성
+        
+        브라우저는 처음 페이지를 열 때 헤드리스로 시작되며 곧바로 로그인 쿠키가 적용됩니다.
+        """
+        worker = copy.copy(self)
+        worker.shard_id = shard_id
+        worker.use_browser = True
+        worker._driver = None
+        worker.pending_driver_cookies = list(cookies)
+        worker.config = dict(self.config, headless_mode=True)
+        worker.startup_timings = {}
+        worker.wait_timings = []
+        worker.extraction_costs = {}
+        return worker
+    
+    def get_worker_cookies(self):
+        """HTTP 세션의 로그인 쿠키를 브라우저에 적용할 수 있는 형태로 반환"""
+        return [
+            {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': bool(cookie.secure),
+                'expiry': cookie.expires
+            }
+            for cookie in self.http_session.cookies
+        ]
+    
+    def get_shard_pool_size(self):
+        """요청한 작업자 수를 CPU 수와 메모리 한도에 맞게 제한"""
+        requested = self.config.get("shard_workers", 3)
+        per_worker_mb = self.config.get("shard_worker_memory_mb", 400)
+        limit_mb = self.config.get("shard_memory_limit_mb", 2048)
+        
+        available_mb = self.detect_available_memory_mb()
+        if available_mb:
+            # 다운로드 등 나머지 작업을 위해 여유 메모리를 남김
+            limit_mb = min(limit_mb, available_mb * 0.8)
+        
+        pool_size = max(1, min(requested, os.cpu_count() or 1, int(limit_mb // per_worker_mb)))
+        if pool_size < requested:
+            print(f"샤드 작업자 수를 {requested}개에서 {pool_size}개로 제한 (CPU/메모리 한도)")
+        return pool_size
+    
+    def detect_available_memory_mb(self):
+        """사용 가능한 메모리(MB) 확인 (확인할 수 없으면 None)"""
+        try:
+            import psutil
+            return psutil.virtual_memory().available / (1024 * 1024)
+        except ImportError:
+            pass
+        
+        try:
+            with open("/proc/meminfo", 'r') as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return None
+    
+    def run_retry_failed(self):
+        """download_info.json의 실패 목록만 다시 다운로드 (브라우저 없이)"""
+        try:
+            print(f"=== 실패 이미지 재시도: {self.download_folder} ===")
+            info = self.load_download_info()
+            if not info:
+                print("download_info.json을 찾을 수 없습니다.")
+                return False
+            
+            failed_images = info.get('failed_images', [])
+            failed_urls = [item['url'] for item in failed_images if item.get('retryable', True)]
+            skipped = len(failed_images) - len(failed_urls)
+            if skipped:
+                print(f"재시도해도 성공하지 않을 실패 {skipped}개 제외 (404, 이미지 아님 등)")
+            if not failed_urls:
+                print("재시도할 실패 이미지가 없습니다.")
+                return True
+            
+            self.log_session(f"실패 이미지 {len(failed_urls)}개 재시도")
+            downloaded_count = self.download_images_with_progress(failed_urls, merge_existing=True)
+            self.log_session(f"재시도 완료: {downloaded_count}개 이미지")
+            return downloaded_count > 0
+            
+        except KeyboardInterrupt:
+            print("\n사용자에 의해 중단되었습니다.")
+            self.log_session("사용자 중단")
+            return False
+        
+        finally:
+            self.save_session_log()
+            self.close()
+    
     def run_simple(self, username, password):
         """간단한 크롤링 테스트"""
         try:
             print("=== Firefox 브라우저로 테스트 시작 ===")
             
             # 로그인 시도
-            if self.login_with_retry(username, password):
+            if self.login(username, password):
                 print("✅ Firefox 브라우저로 로그인 성공!")
                 print("Chrome 문제가 해결될 때까지 Firefox를 사용하세요.")
                 return True
@@ -937,9 +2470,19 @@ class AdvancedMusinsaCrawlerFirefox:
     
     def close(self):
         """리소스 정리"""
-        if self.driver:
+        if self.resolution_prober:
+            self.resolution_prober.close()
+        
+        if self.http_session:
+            self.http_session.close()
+        
+        if self.crawl_state:
+            self.crawl_state.close()
+            self.crawl_state = None
+        
+        if self._driver:
             try:
-                self.driver.quit()
+                self._driver.quit()
                 print("브라우저 종료 완료")
             except Exception as e:
                 print(f"브라우저 종료 중 오류: {e}")
@@ -949,6 +2492,15 @@ def main():
     print("=== 무신사 구매내역 이미지 크롤러 (Firefox 버전) ===")
     print("Firefox가 설치되어 있어야 합니다.")
     
+    # 실패 이미지 재시도 모드 (브라우저 없이 실행)
+    if len(sys.argv) >= 2 and sys.argv[1] == "--retry-failed":
+        if len(sys.argv) < 3:
+            print("사용법: python crawler_main_firefox.py --retry-failed <다운로드_폴더_경로>")
+            return
+        crawler = AdvancedMusinsaCrawlerFirefox(sys.argv[2], use_browser=False, reuse_folder=True)
+        crawler.run_retry_failed()
+        return
+    
     # 설정 파일이 없으면 생성
     if not os.path.exists("crawler_config.json"):
         create_config_file()
@@ -970,6 +2522,8 @@ def main():
             return
         
         crawler = AdvancedMusinsaCrawlerFirefox()
+        if "--browserless" in sys.argv:
+            crawler.config["browserless_mode"] = True
         
         if mode == "1":
             # 간단 테스트
@@ -1002,12 +2556,77 @@ def create_config_file():
     """설정 파일 생성"""
     config = {
         "max_images": 1000,
-        "download_delay": 0.5,
+        "rate_limit_rps": 4.0,
+        "rate_limit_burst": 4,
+        "rate_limit_min_rps": 0.5,
+        "rate_limit_max_rps": 20.0,
         "page_load_timeout": 30,
         "implicit_wait": 10,
         "retry_attempts": 3,
         "image_quality_filter": True,
-        "headless_mode": False
+        "min_image_dimension": 100,
+        "headless_mode": False,
+        "download_workers": 8,
+        "per_host_concurrency": 4,
+        "resume_incomplete_run": True,
+        "http_cache_enabled": True,
+        "cache_folder": "musinsa_cache",
+        "content_store_enabled": True,
+        "crawl_state_file": "crawl_state.db",
+        "incremental_mode": False,
+        "download_max_attempts": 4,
+        "retry_base_delay": 1.0,
+        "retry_max_delay": 60.0,
+        "streaming_pipeline": True,
+        "pipeline_queue_size": 200,
+        "wait_timeout": 10,
+        "order_page_wait_timeout": 5,
+        "bg_extract_budget_ms": 1500,
+        "bg_extract_chunk_ms": 200,
+        "browserless_mode": False,
+        "order_api_handler": "musinsa",
+        "order_api_base_url": "https://www.musinsa.com",
+        "order_api_path": "/order-service/my/order/list",
+        "order_api_page_size": 20,
+        "order_api_max_pages": 200,
+        "order_api_record_folder": "",
+        "persist_login_session": True,
+        "session_file": "login_session.json",
+        "session_max_age_hours": 72,
+        "session_check_url": "https://www.musinsa.com/order/order-list",
+        "geckodriver_path": "",
+        "driver_cache_max_age_hours": 168,
+        "lean_browser_profile": True,
+        "blocked_hosts": [
+            "google-analytics.com",
+            "googletagmanager.com",
+            "doubleclick.net",
+            "googlesyndication.com",
+            "facebook.net",
+            "connect.facebook.com",
+            "criteo.com",
+            "criteo.net",
+            "scorecardresearch.com",
+            "hotjar.com",
+            "clarity.ms",
+            "appsflyer.com",
+            "amplitude.com",
+            "braze.com"
+        ],
+        "sharded_crawl": False,
+        "sharded_page_url_template": "https://www.musinsa.com/order/order-list?page={page}",
+        "shard_workers": 3,
+        "shard_worker_memory_mb": 400,
+        "shard_memory_limit_mb": 2048,
+        "shard_max_pages": 200,
+        "prune_processed_orders": False,
+        "prune_container_selector": ".order-item, [data-order-no], [data-order-id], [data-ord-no]",
+        "selector_cache_enabled": True,
+        "resolution_probe_enabled": True,
+        "resolution_probe_workers": 4,
+        "resolution_probe_timeout": 5,
+        "download_priority": "newest",
+        "download_byte_budget_mb": 0
     }
     
     with open("crawler_config.json", 'w', encoding='utf-8') as f:
@@ -1016,9 +2635,34 @@ def create_config_file():
     print("설정 파일 'crawler_config.json' 생성 완료")
     print("필요에 따라 설정을 수정하세요:")
     print("- max_images: 최대 다운로드 이미지 수")
-    print("- download_delay: 다운로드 간 지연 시간(초)")
+    print("- rate_limit_rps / rate_limit_burst: 호스트별 초당 요청 수 / 순간 허용량")
+    print("- rate_limit_min_rps / rate_limit_max_rps: 자동 조정 시 속도 하한 / 상한")
     print("- image_quality_filter: 저품질 이미지 필터링 여부")
+    print("- min_image_dimension: 품질 필터링 시 최소 가로/세로 픽셀 수")
     print("- headless_mode: 브라우저 창 숨김 여부")
+    print("- download_workers: 동시 다운로드 작업 수")
+    print("- per_host_concurrency: 호스트별 최대 동시 연결 수")
+    print("- resume_incomplete_run: 중단된 이전 다운로드 폴더 이어받기 여부")
+    print("- http_cache_enabled / cache_folder: 실행 간 HTTP 캐시 사용 여부 / 위치 (content_store_enabled 필요)")
+    print("- content_store_enabled: 내용 해시 기반 저장소(중복 이미지 한 번만 저장) 사용 여부")
+    print("- incremental_mode: 이전에 본 주문에 도달하면 탐색을 멈추고 새 이미지만 다운로드")
+    print("- download_max_attempts / retry_base_delay / retry_max_delay: URL별 최대 시도 횟수 / 재시도 대기(초)")
+    print("- streaming_pipeline / pipeline_queue_size: 추출과 다운로드 동시 진행 여부 / 대기 URL 수 한도")
+    print("- wait_timeout / order_page_wait_timeout: 페이지 요소 대기 최대 시간(초)")
+    print("- bg_extract_budget_ms / bg_extract_chunk_ms: 백그라운드 이미지 추출 전체/청크 시간 예산(ms)")
+    print("- browserless_mode: 로그인 후 브라우저 대신 구매 내역 JSON 엔드포인트로 이미지 URL 수집")
+    print("- order_api_base_url / order_api_path: 구매 내역 엔드포인트 주소 (녹화 응답 서버로 교체 가능)")
+    print("- order_api_record_folder: 받은 구매 내역 응답을 저장할 폴더 (비우면 저장 안 함)")
+    print("- persist_login_session / session_max_age_hours: 로그인 쿠키 저장·재사용 여부 / 최대 보관 시간")
+    print("- geckodriver_path / driver_cache_max_age_hours: geckodriver 직접 지정 / 자동 확인 결과 캐시 시간")
+    print("- lean_browser_profile / blocked_hosts: 이미지·미디어·폰트 차단 경량 프로필 사용 여부 / 차단할 제3자 호스트")
+    print("- sharded_crawl / shard_workers: 여러 헤드리스 브라우저로 구매 내역 페이지 분할 탐색 여부 / 작업자 수")
+    print("- shard_worker_memory_mb / shard_memory_limit_mb: 작업자당 예상 메모리 / 전체 메모리 한도(MB)")
+    print("- prune_processed_orders: 페이지마다 처리한 주문 노드를 DOM에서 제거하여 브라우저 메모리 유지")
+    print("- selector_cache_enabled: 지난 실행에서 성공한 셀렉터·구매 내역 URL을 먼저 시도")
+    print("- resolution_probe_enabled: 고해상도 후보 URL이 실제로 있는지 확인 후 가장 큰 이미지 다운로드")
+    print("- download_priority: 다운로드 순서 (newest, highest_resolution, smallest, fifo)")
+    print("- download_byte_budget_mb: 이번 실행에서 받을 최대 용량(MB, 0이면 제한 없음)")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,849 @@
+# 다운로드 보조 도구 모음
+import os
+import re
+import hashlib
+import heapq
+import queue
+import random
+import struct
+import threading
+import time
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0',
+    'Referer': 'https://www.musinsa.com/',
+    'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8'
+}
+
+PART_SUFFIX = '.part'
+
+class IncompleteDownloadError(Exception):
+    """받은 바이트 수가 Content-Length와 맞지 않을 때 발생"""
+
+class DownloadCancelled(Exception):
+    """사용자 중단으로 다운로드가 취소되었을 때 발생"""
+
+class ImageRejected(Exception):
+    """본문을 받기 전에 이미지가 아니거나 너무 작다고 판단될 때 발생"""
+
+class UrlFeed:
+    """추출 단계에서 다운로드 단계로 URL을 넘기는 크기 제한 큐
+
+    중복 URL은 한 번만 넘기고, 큐가 가득 차면 put이 대기하여 추출 쪽 속도를 늦춥니다(역압력).
+    key_func를 지정하면 그 키가 같은 URL(예: 같은 이미지의 크기 변형)을 중복으로 봅니다.
+    추출이 끝나면 close()로 종료 표시(None)를 넣습니다.
+    """
+
+    def __init__(self, maxsize=200, max_items=None, url_filter=None, key_func=None):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.max_items = max_items
+        self.url_filter = url_filter
+        self.key_func = key_func
+        self.seen = {}
+        self.accepted = 0
+        self.collapsed = 0
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_list(cls, urls):
+        """이미 모아 둔 URL 목록으로 닫힌 피드 생성"""
+        feed = cls(maxsize=0)
+        for url in urls:
+            feed.put(url)
+        feed.close()
+        return feed
+
+    def put(self, url):
+        """URL 추가 (새 URL이면 True, 중복·제외·한도 초과면 False)"""
+        key = self.key_func(url) if self.key_func else url
+        with self._lock:
+            if key in self.seen:
+                if self.seen[key] != url:
+                    self.collapsed += 1
+                return False
+            self.seen[key] = url
+            if self.url_filter and not self.url_filter(url):
+                return False
+            if self.max_items is not None and self.accepted >= self.max_items:
+                return False
+            self.accepted += 1
+        self._put_blocking(url)
+        return True
+
+    def _put_blocking(self, item):
+        """취소되지 않는 한 자리가 날 때까지 대기하며 넣기"""
+        while not self.cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        """추출 종료 표시"""
+        self._put_blocking(None)
+
+    def cancel(self):
+        """대기 중인 put을 풀고 더 이상 넣지 않음"""
+        self.cancelled.set()
+
+    def get(self, timeout=None):
+        """다음 URL 꺼내기 (종료 표시면 None, 없으면 queue.Empty)"""
+        if timeout == 0:
+            return self._queue.get_nowait()
+        return self._queue.get(timeout=timeout)
+
+class RetryQueue:
+    """지수 백오프와 지터를 적용한 재시도 지연 큐
+
+    URL별 시도 횟수를 세고, 최대 시도 횟수를 넘으면 더 이상 예약하지 않습니다.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=60.0):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.attempts = defaultdict(int)
+        self._heap = []
+        self._counter = 0
+
+    def record_attempt(self, key):
+        """시도 횟수 증가 후 현재 횟수 반환"""
+        self.attempts[key] += 1
+        return self.attempts[key]
+
+    def backoff_delay(self, attempt):
+        """attempt번째 실패 후 대기 시간 (절반 고정 + 절반 무작위 지터)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def schedule(self, key, item, retry_after=None):
+        """재시도 예약 (시도 횟수를 모두 쓰면 False, 예약되면 대기 시간 반환)"""
+        attempt = self.attempts[key]
+        if attempt >= self.max_attempts:
+            return False
+        delay = self.backoff_delay(attempt)
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        self._counter += 1
+        heapq.heappush(self._heap, (time.monotonic() + delay, self._counter, item))
+        return delay
+
+    def pop_ready(self):
+        """대기 시간이 지난 항목 모두 꺼내기"""
+        ready = []
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            ready.append(heapq.heappop(self._heap)[2])
+        return ready
+
+    def time_until_next(self):
+        """다음 항목까지 남은 시간 (비어 있으면 None)"""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def __len__(self):
+        return len(self._heap)
+
+class DownloadScheduler:
+    """다운로드할 URL을 우선순위 순으로 내보내는 대기열
+
+    priority_func(url)이 작은 값을 먼저 내보내고, 같으면 들어온 순서를 따릅니다.
+    max_items(내보낸 수)와 byte_budget(받은 바이트 수)은 우선순위 순으로 적용되어
+    한도에 도달하면 남은 낮은 순위 URL은 버리고 dropped에 모아 둡니다.
+    용량 예산은 시작한 다운로드마다 예상 크기(지금까지 받은 평균, 없으면 default_estimate)를
+    reserve()로 잡아 두고 release()에서 실제 크기로 바꾸므로, 동시에 진행 중인 다운로드로 예산을 넘지 않습니다.
+    defer=True면 close()가 호출될 때까지 내보내지 않고 모아서 전체 중 우선순위를 정합니다.
+    window를 지정하면 그 수만큼만 모아 두어 피드의 역압력을 유지합니다(모으는 중에는 무시).
+    """
+
+    def __init__(self, priority_func=None, max_items=None, byte_budget=None, window=None, defer=False,
+                 default_estimate=300 * 1024):
+        self.priority_func = priority_func
+        self.max_items = max_items
+        self.byte_budget = byte_budget
+        self.window = window
+        self.defer = defer
+        self.closed = False
+        self.default_estimate = default_estimate
+        self.bytes_used = 0
+        self.reserved = {}
+        self._received = []
+        self._heap = []
+        self._counter = 0
+        self.dropped = []
+        self.stats = {'scheduled': 0, 'dropped_max_items': 0, 'dropped_byte_budget': 0}
+
+    def wants_more(self):
+        """피드에서 더 가져와도 되는지 여부"""
+        return self.is_holding() or self.window is None or len(self._heap) < self.window
+
+    def is_holding(self):
+        """close() 전까지 URL을 모으기만 하는 중인지 여부"""
+        return self.defer and not self.closed
+
+    def push(self, url):
+        """URL 추가 (이미 한도에 도달했으면 바로 버림)"""
+        reason = self._limit_reason()
+        if reason:
+            self.stats[reason] += 1
+            self.dropped.append(url)
+            return
+        priority = self.priority_func(url) if self.priority_func else ()
+        self._counter += 1
+        heapq.heappush(self._heap, (priority, self._counter, url))
+
+    def pop(self):
+        """다음 URL 꺼내기 (없거나 대기 중이거나 한도에 도달하면 None)"""
+        if not self._heap or self.is_holding():
+            return None
+        reason = self._limit_reason()
+        if reason is None and self._would_exceed_budget():
+            if self.reserved:
+                # 진행 중인 다운로드가 끝나 실제 크기를 알 때까지 대기
+                return None
+            reason = 'dropped_byte_budget'
+        if reason:
+            # 남은 낮은 순위 URL은 모두 버림
+            self.stats[reason] += len(self._heap)
+            self.dropped.extend(url for _, _, url in sorted(self._heap))
+            self._heap.clear()
+            return None
+        self.stats['scheduled'] += 1
+        return heapq.heappop(self._heap)[2]
+
+    def estimated_size(self):
+        """다음 다운로드의 예상 크기 (지금까지 네트워크로 받은 평균)"""
+        if self._received:
+            return sum(self._received) / len(self._received)
+        return self.default_estimate
+
+    def reserve(self, key):
+        """다운로드 시작 시 예상 크기만큼 예산 확보"""
+        self.reserved[key] = self.estimated_size()
+
+    def release(self, key, network_bytes=0):
+        """다운로드가 끝나면 확보한 예산을 풀고 네트워크로 실제 받은 바이트 수 반영 (실패·캐시 사용은 0)"""
+        self.reserved.pop(key, None)
+        if network_bytes:
+            self.bytes_used += network_bytes
+            self._received.append(network_bytes)
+
+    def _would_exceed_budget(self):
+        """한 개 더 시작하면 받은 바이트와 진행 중 예상 크기의 합이 예산을 넘는지 여부
+
+        아직 받은 것도 진행 중인 것도 없으면 예상 크기를 알 수 있도록 하나는 시작합니다.
+        """
+        if not self.byte_budget or (not self._received and not self.reserved):
+            return False
+        projected = self.bytes_used + sum(self.reserved.values()) + self.estimated_size()
+        return projected > self.byte_budget
+
+    def close(self):
+        """더 들어올 URL이 없음 (모아 둔 URL 내보내기 시작)"""
+        self.closed = True
+
+    def _limit_reason(self):
+        """도달한 한도의 통계 키 (도달하지 않았으면 None)"""
+        if self.max_items is not None and self.stats['scheduled'] >= self.max_items:
+            return 'dropped_max_items'
+        if self.byte_budget and self.bytes_used >= self.byte_budget:
+            return 'dropped_byte_budget'
+        return None
+
+    def __len__(self):
+        return len(self._heap)
+
+def classify_download_error(error):
+    """다운로드 오류를 (사유, 재시도 가능 여부)로 분류"""
+    if isinstance(error, IncompleteDownloadError):
+        return f"불완전한 다운로드 ({error})", True
+    if isinstance(error, requests.exceptions.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        retryable = status is None or status >= 500 or status in (408, 425, 429)
+        return f"HTTP {status}", retryable
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                          requests.exceptions.ChunkedEncodingError)):
+        return f"네트워크 오류 ({type(error).__name__})", True
+    if isinstance(error, requests.exceptions.RequestException):
+        return f"요청 오류 ({error})", False
+    return f"다운로드 실패 ({error})", False
+
+class HostConcurrencyLimiter:
+    """호스트별 동시 다운로드 수 제한"""
+
+    def __init__(self, max_per_host=4):
+        self.max_per_host = max(1, int(max_per_host))
+        self._lock = threading.Lock()
+        self._semaphores = defaultdict(lambda: threading.BoundedSemaphore(self.max_per_host))
+
+    def _semaphore_for(self, url):
+        """URL의 호스트에 해당하는 세마포어 반환"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            return self._semaphores[host]
+
+    @contextmanager
+    def slot(self, url):
+        """호스트 슬롯을 점유한 상태로 블록 실행"""
+        semaphore = self._semaphore_for(url)
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+class AdaptiveRateLimiter:
+    """호스트별 적응형 토큰 버킷 속도 제한
+
+    성공 시 초당 요청 수를 조금씩 올리고(가산 증가), 429/503 응답을 받으면
+    크게 줄입니다(승산 감소). Retry-After가 있으면 해당 시간 동안 호스트 요청을 멈춥니다.
+    """
+
+    THROTTLE_STATUS_CODES = (429, 503)
+
+    def __init__(self, rate=4.0, burst=4, min_rate=0.5, max_rate=20.0,
+                 increase_step=0.1, backoff_factor=0.5, on_rate_change=None):
+        self.initial_rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.min_rate = float(min_rate)
+        self.max_rate = max(float(max_rate), self.min_rate)
+        self.increase_step = float(increase_step)
+        self.backoff_factor = float(backoff_factor)
+        self.on_rate_change = on_rate_change
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def _bucket_for(self, host):
+        """호스트 버킷 반환 (잠금 상태에서 호출)"""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = {
+                'rate': min(max(self.initial_rate, self.min_rate), self.max_rate),
+                'tokens': self.burst,
+                'updated': time.monotonic(),
+                'blocked_until': 0.0
+            }
+            self._buckets[host] = bucket
+        return bucket
+
+    def _refill(self, bucket, now):
+        """경과 시간만큼 토큰 충전"""
+        elapsed = now - bucket['updated']
+        bucket['tokens'] = min(self.burst, bucket['tokens'] + elapsed * bucket['rate'])
+        bucket['updated'] = now
+
+    def acquire(self, url):
+        """요청 토큰을 얻을 때까지 대기"""
+        host = urlparse(url).netloc.lower()
+        while True:
+            with self._lock:
+                bucket = self._bucket_for(host)
+                now = time.monotonic()
+                self._refill(bucket, now)
+
+                if now < bucket['blocked_until']:
+                    wait = bucket['blocked_until'] - now
+                elif bucket['tokens'] >= 1:
+                    bucket['tokens'] -= 1
+                    return
+                else:
+                    wait = (1 - bucket['tokens']) / bucket['rate']
+            time.sleep(wait)
+
+    def _set_rate(self, host, bucket, new_rate, reason):
+        """속도 변경 및 콜백 호출 (잠금 상태에서 호출)"""
+        new_rate = min(max(new_rate, self.min_rate), self.max_rate)
+        old_rate = bucket['rate']
+        bucket['rate'] = new_rate
+        # 증가는 정수 단위를 넘을 때만 알려 로그가 넘치지 않도록 함
+        changed = int(old_rate) != int(new_rate) if reason == 'success' else old_rate != new_rate
+        if self.on_rate_change and changed:
+            self.on_rate_change(host, old_rate, new_rate, reason)
+
+    def record_success(self, url):
+        """성공 응답 기록 (가산 증가)"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            bucket = self._bucket_for(host)
+            self._set_rate(host, bucket, bucket['rate'] + self.increase_step, 'success')
+
+    def record_throttled(self, url, retry_after=None):
+        """제한 응답 기록 (승산 감소 및 Retry-After 대기)"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            bucket = self._bucket_for(host)
+            now = time.monotonic()
+            self._refill(bucket, now)
+            bucket['tokens'] = 0.0
+            if retry_after:
+                bucket['blocked_until'] = max(bucket['blocked_until'], now + retry_after)
+            self._set_rate(host, bucket, bucket['rate'] * self.backoff_factor, 'throttled')
+
+    def current_rates(self):
+        """호스트별 현재 초당 요청 수"""
+        with self._lock:
+            return {host: round(bucket['rate'], 2) for host, bucket in self._buckets.items()}
+
+def parse_retry_after(value):
+    """Retry-After 헤더를 초 단위로 변환 (숫자 또는 HTTP 날짜)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def create_http_session(pool_size=8, headers=None):
+    """연결 풀을 공유하는 HTTP 세션 생성
+
+    pool_size는 동시 다운로드 수와 맞춰야 작업 스레드가 연결을 기다리지 않습니다.
+    """
+    pool_size = max(1, int(pool_size))
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(headers or DEFAULT_HEADERS)
+    return session
+
+def import_selenium_cookies(session, selenium_cookies):
+    """Selenium 드라이버 쿠키를 HTTP 세션으로 복사
+
+    반환값: 복사된 쿠키 수
+    """
+    imported = 0
+    for cookie in selenium_cookies or []:
+        name = cookie.get('name')
+        if not name:
+            continue
+        session.cookies.set(
+            name,
+            cookie.get('value', ''),
+            domain=cookie.get('domain', ''),
+            path=cookie.get('path', '/'),
+            secure=cookie.get('secure', False),
+            expires=cookie.get('expiry')
+        )
+        imported += 1
+    return imported
+
+def get_connection_stats(session):
+    """세션 연결 풀의 연결 재사용 통계 수집"""
+    stats = {'requests': 0, 'new_connections': 0, 'reused_connections': 0, 'pools': 0}
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+
+    for adapter in adapters.values():
+        pool_manager = getattr(adapter, 'poolmanager', None)
+        if pool_manager is None:
+            continue
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+            if pool is None:
+                continue
+            stats['pools'] += 1
+            stats['requests'] += pool.num_requests
+            stats['new_connections'] += pool.num_connections
+
+    stats['reused_connections'] = max(0, stats['requests'] - stats['new_connections'])
+    return stats
+
+def probe_image_size(session, url, timeout=5):
+    """HEAD 요청(거부되면 1바이트 Range GET)으로 이미지 존재 여부와 크기 확인
+
+    반환값: 전체 바이트 수 (존재하지만 크기를 모르면 0), 없으면 None
+    """
+    try:
+        response = session.head(url, timeout=timeout, allow_redirects=True)
+        if response.status_code in (403, 405, 501) or 'Content-Length' not in response.headers:
+            response = session.get(url, headers={'Range': 'bytes=0-0'}, timeout=timeout, stream=True)
+            response.close()
+    except requests.exceptions.RequestException:
+        return None
+
+    if response.status_code not in (200, 206):
+        return None
+    if not response.headers.get('Content-Type', 'image/').startswith('image/'):
+        return None
+
+    match = re.search(r'/(\d+)$', response.headers.get('Content-Range', ''))
+    if match:
+        return int(match.group(1))
+    if response.status_code == 200:
+        return int(response.headers.get('Content-Length') or 0)
+    return 0
+
+class ResolutionProber:
+    """해상도 후보 URL을 동시에 확인해 가장 큰 이미지를 고르고, URL 패턴별로 통한 변환을 기억
+
+    같은 패턴의 URL은 기억한 변환을 바로 적용하여 확인 요청을 생략합니다.
+    기억한 변환은 cache_path에 저장되어 다음 실행에서도 사용됩니다.
+    """
+
+    def __init__(self, session, rules, cache_path=None, max_workers=4, timeout=5, rate_limiter=None):
+        self.session = session
+        self.rules = rules
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="probe")
+        self._lock = threading.Lock()
+        self._key_locks = defaultdict(threading.Lock)
+        self._dirty = False
+        self.stats = {'learned': 0, 'probed': 0, 'probe_requests': 0, 'unresolved': 0, 'forgotten': 0}
+        self.learned = self.load()
+
+    def load(self):
+        """기억한 변환 로드 ({패턴 키: 대체 문자열, 원래 URL이 최선이면 ''})"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"해상도 변환 기록 로드 오류: {e}")
+            return {}
+
+    def save(self):
+        """변경된 경우에만 기억한 변환 저장"""
+        with self._lock:
+            if not self.cache_path or not self._dirty:
+                return
+            snapshot = dict(self.learned)
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def resolve(self, url):
+        """받을 URL 결정 (후보가 없거나 모두 확인에 실패하면 규칙 기반 추측 URL)"""
+        key, candidates = self.rules.resolution_candidates(url)
+        if not key:
+            return url
+
+        # 같은 패턴을 여러 작업자가 동시에 확인하지 않도록 키별로 순서를 맞춤
+        with self._key_locks[key]:
+            replacement = self.learned.get(key)
+            if replacement is not None:
+                with self._lock:
+                    self.stats['learned'] += 1
+                return self._apply(candidates, replacement)
+
+            best = self._probe(candidates)
+            with self._lock:
+                self.stats['probed'] += 1
+                self.stats['probe_requests'] += len(candidates)
+                if best is None:
+                    self.stats['unresolved'] += 1
+                else:
+                    self.learned[key] = best[0] or ''
+                    self._dirty = True
+
+        if best is None:
+            return self.rules.to_high_resolution(url)
+        return best[1]
+
+    def forget(self, url):
+        """기억한 변환이 더 이상 통하지 않을 때 삭제 (다음 URL에서 다시 확인)"""
+        key, _ = self.rules.resolution_candidates(url)
+        with self._lock:
+            if key and self.learned.pop(key, None) is not None:
+                self.stats['forgotten'] += 1
+                self._dirty = True
+
+    def _apply(self, candidates, replacement):
+        for candidate_replacement, candidate_url in candidates:
+            if (candidate_replacement or '') == replacement:
+                return candidate_url
+        return candidates[-1][1]
+
+    def _probe(self, candidates):
+        """후보를 동시에 확인해 가장 큰 (대체 문자열, URL) 반환 (크기가 같으면 앞 후보 우선)"""
+        def check(candidate_url):
+            if self.rate_limiter:
+                self.rate_limiter.acquire(candidate_url)
+            return probe_image_size(self.session, candidate_url, self.timeout)
+
+        futures = [self._executor.submit(check, candidate_url) for _, candidate_url in candidates]
+        best = None
+        best_size = -1
+        for candidate, future in zip(candidates, futures):
+            size = future.result()
+            if size is not None and size > best_size:
+                best, best_size = candidate, size
+        return best
+
+    def close(self):
+        """확인용 스레드 풀 종료"""
+        self._executor.shutdown(wait=False)
+
+def get_part_path(folder, url):
+    """URL별 임시(.part) 파일 경로
+
+    파일명이 아닌 URL 해시를 사용하므로 재실행 시 파일명이 달라져도 이어받을 수 있습니다.
+    """
+    url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(folder, f".{url_hash}{PART_SUFFIX}")
+
+def build_range_headers(part_path):
+    """이어받기용 Range 헤더와 시작 위치 반환"""
+    resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if resume_from > 0:
+        return {'Range': f'bytes={resume_from}-'}, resume_from
+    return {}, 0
+
+def get_expected_length(response, resume_from):
+    """응답으로부터 완성 파일의 전체 길이 계산 (알 수 없으면 None)"""
+    # 압축 전송이면 Content-Length가 실제 바이트 수와 다름
+    if response.headers.get('Content-Encoding', 'identity') not in ('', 'identity'):
+        return None
+
+    if response.status_code == 206:
+        match = re.match(r'bytes\s+(\d+)-(\d+)/(\d+|\*)', response.headers.get('Content-Range', ''))
+        if match and match.group(3) != '*':
+            return int(match.group(3))
+        offset = resume_from
+    else:
+        offset = 0
+
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit():
+        return offset + int(content_length)
+    return None
+
+def stream_to_part_file(response, part_path, append=False, stop_event=None, hasher=None,
+                        prefix=b'', chunk_size=8192):
+    """응답 본문을 .part 파일에 기록
+
+    hasher가 주어지면 기록하는 바이트로 해시를 함께 계산합니다 (이어받기면 기존 부분 포함).
+    prefix는 헤더 검사를 위해 먼저 읽어 둔 본문 앞부분입니다.
+    반환값: 기록 후 .part 파일 크기
+    """
+    if append and hasher is not None:
+        with open(part_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                hasher.update(chunk)
+
+    with open(part_path, 'ab' if append else 'wb') as f:
+        if prefix:
+            f.write(prefix)
+            if hasher is not None:
+                hasher.update(prefix)
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if stop_event is not None and stop_event.is_set():
+                raise DownloadCancelled(part_path)
+            if chunk:
+                f.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+    return os.path.getsize(part_path)
+
+def verify_part_file(part_path, expected_length=None):
+    """.part 파일 길이를 Content-Length와 비교 검증
+
+    반환값: .part 파일 크기
+    """
+    actual_length = os.path.getsize(part_path)
+    if expected_length is not None and actual_length != expected_length:
+        if actual_length > expected_length:
+            # 이어받을 수 없는 손상 파일
+            os.remove(part_path)
+        raise IncompleteDownloadError(f"{actual_length}/{expected_length} bytes")
+    return actual_length
+
+def find_incomplete_run_folder(base_folder):
+    """.part 파일이 남아 있는 가장 최근 실행 폴더 검색"""
+    parent = os.path.dirname(base_folder) or '.'
+    prefix = os.path.basename(base_folder) + '_'
+    if not os.path.isdir(parent):
+        return None
+
+    candidates = sorted(
+        (name for name in os.listdir(parent)
+         if name.startswith(prefix) and os.path.isdir(os.path.join(parent, name))),
+        reverse=True
+    )
+    for name in candidates:
+        folder = os.path.join(parent, name)
+        if any(entry.endswith(PART_SUFFIX) for entry in os.listdir(folder)):
+            return folder
+    return None
+
+class DownloadIndex:
+    """실행 폴더에 이미 받은 이미지의 메모리 색인
+
+    매니페스트(download_info.json)의 성공 목록과 폴더 목록을 한 번만 읽어 두고,
+    이후 건너뛰기 판단은 파일마다 stat하지 않고 색인만 조회합니다.
+    매니페스트에 있어도 폴더에서 지워진 파일은 다시 받습니다.
+    """
+
+    def __init__(self, folder, entries=(), filenames=()):
+        self.folder = folder
+        self.present = set(filenames)
+        self.by_url = {}
+        self.by_filename = {}
+        for entry in entries:
+            if entry.get('url') and entry.get('filename'):
+                self.by_url[entry['url']] = entry
+                self.by_filename[entry['filename']] = entry
+
+    @classmethod
+    def load(cls, folder, manifest_name="download_info.json"):
+        """매니페스트와 폴더 목록으로 색인 생성 (없거나 읽을 수 없으면 빈 색인)"""
+        entries = []
+        try:
+            with open(os.path.join(folder, manifest_name), 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('images', [])
+        except (OSError, ValueError, AttributeError):
+            pass
+        try:
+            filenames = os.listdir(folder)
+        except OSError:
+            filenames = []
+        return cls(folder, entries, filenames)
+
+    def lookup(self, url, filename):
+        """이미 받은 이미지면 매니페스트 항목, 아니면 None
+
+        같은 이미지의 다른 변형 URL이어도 파일명이 같으면 받은 것으로 봅니다.
+        매니페스트 없이 파일만 있으면(중단된 실행) 그 파일만 stat하여 항목을 만듭니다.
+        """
+        entry = self.by_url.get(url)
+        if entry and entry['filename'] in self.present:
+            return entry
+        if filename not in self.present:
+            return None
+
+        entry = self.by_filename.get(filename)
+        if entry is None:
+            try:
+                size = os.path.getsize(os.path.join(self.folder, filename))
+            except OSError:
+                return None
+            entry = {
+                'filename': filename,
+                'url': url,
+                'size': size,
+                'sha256': None,
+                'source': 'existing',
+                'timestamp': datetime.now().isoformat()
+            }
+            self.by_filename[filename] = entry
+        return entry
+
+def sniff_image_format(data):
+    """본문 앞부분의 매직 바이트로 이미지 형식 판별 (알 수 없으면 None)"""
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    if data[4:12] in (b'ftypavif', b'ftypavis'):
+        return 'avif'
+    return None
+
+def read_image_dimensions(data, image_format):
+    """이미지 헤더에서 (너비, 높이) 읽기 (데이터가 부족하면 None)"""
+    try:
+        if image_format == 'png' and len(data) >= 24:
+            return struct.unpack('>II', data[16:24])
+
+        if image_format == 'gif' and len(data) >= 10:
+            return struct.unpack('<HH', data[6:10])
+
+        if image_format == 'webp' and len(data) >= 30:
+            chunk = data[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', data[26:30])
+                return width & 0x3fff, height & 0x3fff
+            if chunk == b'VP8L':
+                bits = struct.unpack('<I', data[21:25])[0]
+                return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+            if chunk == b'VP8X':
+                width = int.from_bytes(data[24:27], 'little') + 1
+                height = int.from_bytes(data[27:30], 'little') + 1
+                return width, height
+
+        if image_format == 'jpeg':
+            # SOF 마커가 나올 때까지 세그먼트 탐색
+            offset = 2
+            while offset + 9 <= len(data):
+                if data[offset] != 0xFF:
+                    return None
+                marker = data[offset + 1]
+                if marker == 0xFF:
+                    offset += 1
+                    continue
+                if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                    offset += 2
+                    continue
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+                    return width, height
+                segment_length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+                offset += 2 + segment_length
+    except struct.error:
+        return None
+    return None
+
+def inspect_image_stream(response, min_bytes=0, min_dimension=0, max_header_bytes=65536):
+    """본문을 디스크에 쓰기 전에 크기/형식/해상도 검사
+
+    Content-Length와 본문 앞부분만으로 판단하며, 거부 사유가 있으면 ImageRejected를 발생시킵니다.
+    반환값: 검사하느라 읽은 본문 앞부분 (이후 기록 시 prefix로 사용)
+    """
+    content_length = response.headers.get('Content-Length')
+    if min_bytes and content_length and content_length.isdigit() and int(content_length) < min_bytes:
+        raise ImageRejected(f"크기 {int(content_length):,} bytes")
+
+    prefix = b''
+    read_size = 512
+    image_format = None
+    while len(prefix) < max_header_bytes:
+        data = response.raw.read(read_size, decode_content=True)
+        if not data:
+            break
+        prefix += data
+
+        image_format = image_format or sniff_image_format(prefix)
+        if image_format is None:
+            if len(prefix) >= 16:
+                raise ImageRejected("이미지 형식 아님")
+            continue
+        if image_format == 'avif' or not min_dimension:
+            return prefix
+
+        dimensions = read_image_dimensions(prefix, image_format)
+        if dimensions:
+            if min(dimensions) < min_dimension:
+                raise ImageRejected(f"해상도 {dimensions[0]}x{dimensions[1]}")
+            return prefix
+        read_size = min(read_size * 4, max_header_bytes - len(prefix))
+
+    if image_format is None:
+        raise ImageRejected("이미지 형식 아님")
+    return prefix
@@ -101,14 +101,20 @@ class ImageAnalyzer:
         """중복 이미지 찾기 (해시 기반)"""
         print("\n중복 이미지 검사 중...")
         hash_dict = defaultdict(list)
+        known_hashes = self.load_known_hashes()
         
         for filename in os.listdir(self.folder_path):
             if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.webp', '.gif')):
+                # 다운로드 중 계산된 해시가 있으면 파일을 다시 읽지 않음
+                if filename in known_hashes:
+                    hash_dict[known_hashes[filename]].append(filename)
+                    continue
+                
                 filepath = os.path.join(self.folder_path, filename)
                 
                 try:
                     with open(filepath, 'rb') as f:
-                        file_hash = hashlib.md5(f.read()).hexdigest()
+                        file_hash = hashlib.sha256(f.read()).hexdigest()
                         hash_dict[file_hash].append(filename)
                 except Exception as e:
                     print(f"해시 계산 실패: {filename} - {e}")
@@ -117,6 +123,21 @@ class ImageAnalyzer:
         duplicates = {k: v for k, v in hash_dict.items() if len(v) > 1}
         return duplicates
     
+    def load_known_hashes(self):
+        """download_info.json에 기록된 파일별 SHA-256 해시 로드"""
+        info_file = os.path.join(self.folder_path, "download_info.json")
+        if not os.path.exists(info_file):
+            return {}
+        
+        try:
+            with open(info_file, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+            return {item['filename']: item['sha256']
+                    for item in info.get('images', []) if item.get('sha256')}
+        except Exception as e:
+            print(f"다운로드 정보 로드 실패: {e}")
+            return {}
+    
     def handle_duplicates(self, duplicates):
         """중복 이미지 처리"""
         print("\n중복 이미지 목록:")
@@ -255,7 +276,7 @@ class ImageOrganizer:
     
     def extract_brand_from_filename(self, filename):
         """파일명에서 브랜드명 추출"""
-        # 파일명 패턴: musinsa_brand_productid_001.jpg
+        # 파일명 패턴: musinsa_brand_productid_<해시>.jpg
         parts = filename.split('_')
         
         if len(parts) >= 2 and parts[0] == 'musinsa':
@@ -0,0 +1,230 @@
+# 브라우저 없이 구매 내역 JSON 엔드포인트를 호출하는 도구
+import os
+import re
+import sys
+import json
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urljoin, urlparse, parse_qs
+
+IMAGE_URL_PATTERN = re.compile(r'^(https?:)?//?[^\s"\'<>]+\.(jpg|jpeg|png|webp|gif)(\?[^\s"\'<>]*)?$', re.IGNORECASE)
+
+class OrderApiError(Exception):
+    """구매 내역 엔드포인트가 사용할 수 없는 응답을 반환함 (세션 만료, JSON 아님 등)"""
+
+class OrderHistoryEndpoint(ABC):
+    """구매 내역 엔드포인트 처리기 기본 클래스
+
+    하위 클래스는 페이지 번호로 요청을 만드는 build_request와
+    응답 JSON에서 주문 번호, 이미지 URL, 다음 페이지 여부를 꺼내는 parse_page를 구현해야 하며,
+    빠뜨리면 create_endpoint에서 생성할 때 TypeError가 발생합니다.
+    """
+
+    name = None
+    first_page = 1
+
+    def __init__(self, base_url, path, page_size=20, image_base_url="https://image.msscdn.net"):
+        self.base_url = base_url
+        self.path = path
+        self.page_size = page_size
+        self.image_base_url = image_base_url
+
+    @abstractmethod
+    def build_request(self, page):
+        """(요청 URL, 쿼리 파라미터) 반환"""
+
+    @abstractmethod
+    def parse_page(self, payload):
+        """{'order_ids': [...], 'image_urls': [...], 'has_next': bool} 반환"""
+
+    def absolute_image_url(self, value):
+        """상대 경로나 스킴 없는 이미지 URL을 절대 URL로 변환"""
+        if value.startswith('//'):
+            return 'https:' + value
+        if value.startswith('/'):
+            return urljoin(self.image_base_url, value)
+        return value
+
+class MusinsaOrderEndpoint(OrderHistoryEndpoint):
+    """무신사 구매 내역 목록 API 처리기
+
+    응답 구조가 바뀌어도 동작하도록 JSON 전체를 순회하며
+    주문 번호 키와 이미지 경로처럼 보이는 문자열 값을 수집합니다.
+    """
+
+    name = "musinsa"
+    ORDER_ID_KEYS = ('orderNo', 'orderId', 'ordNo', 'order_no', 'order_id')
+    HAS_NEXT_KEYS = ('hasNext', 'hasNextPage', 'has_next')
+    IS_LAST_KEYS = ('isLast', 'last', 'is_last')
+
+    def build_request(self, page):
+        url = urljoin(self.base_url, self.path)
+        return url, {'page': page, 'size': self.page_size}
+
+    def parse_page(self, payload):
+        order_ids = []
+        image_urls = []
+        flags = {}
+        self._walk(payload, order_ids, image_urls, flags)
+
+        if 'has_next' in flags:
+            has_next = flags['has_next']
+        elif 'is_last' in flags:
+            has_next = not flags['is_last']
+        elif 'total_pages' in flags and 'page' in flags:
+            has_next = flags['page'] < flags['total_pages']
+        else:
+            # 페이지 정보가 없으면 빈 페이지가 나올 때까지 진행
+            has_next = bool(order_ids or image_urls)
+
+        return {
+            'order_ids': list(dict.fromkeys(order_ids)),
+            'image_urls': list(dict.fromkeys(image_urls)),
+            'has_next': has_next
+        }
+
+    def _walk(self, node, order_ids, image_urls, flags):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in self.ORDER_ID_KEYS and isinstance(value, (str, int)):
+                    order_ids.append(str(value))
+                elif key in self.HAS_NEXT_KEYS and isinstance(value, bool):
+                    flags.setdefault('has_next', value)
+                elif key in self.IS_LAST_KEYS and isinstance(value, bool):
+                    flags.setdefault('is_last', value)
+                elif key == 'totalPages' and isinstance(value, int):
+                    flags.setdefault('total_pages', value)
+                elif key in ('page', 'currentPage') and isinstance(value, int):
+                    flags.setdefault('page', value)
+                else:
+                    self._walk(value, order_ids, image_urls, flags)
+        elif isinstance(node, list):
+            for item in node:
+                self._walk(item, order_ids, image_urls, flags)
+        elif isinstance(node, str) and IMAGE_URL_PATTERN.match(node):
+            image_urls.append(self.absolute_image_url(node))
+
+ENDPOINT_HANDLERS = {
+    MusinsaOrderEndpoint.name: MusinsaOrderEndpoint
+}
+
+def register_endpoint(handler_class):
+    """엔드포인트 처리기 등록 (설정의 order_api_handler 이름으로 선택)"""
+    ENDPOINT_HANDLERS[handler_class.name] = handler_class
+    return handler_class
+
+def create_endpoint(name, **kwargs):
+    """이름으로 엔드포인트 처리기 생성"""
+    if name not in ENDPOINT_HANDLERS:
+        raise ValueError(f"알 수 없는 구매 내역 엔드포인트 처리기: {name}")
+    return ENDPOINT_HANDLERS[name](**kwargs)
+
+class OrderHistoryClient:
+    """로그인된 HTTP 세션으로 구매 내역 엔드포인트를 페이지 단위로 호출
+
+    record_folder를 지정하면 받은 응답을 page_<번호>.json으로 저장하여
+    serve_recorded_responses로 다시 재생할 수 있습니다.
+    """
+
+    def __init__(self, session, endpoint, max_pages=200, timeout=15, record_folder=None, rate_limiter=None):
+        self.session = session
+        self.endpoint = endpoint
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.record_folder = record_folder
+        self.rate_limiter = rate_limiter
+        if record_folder:
+            os.makedirs(record_folder, exist_ok=True)
+
+    def fetch_page(self, page):
+        """한 페이지 응답 JSON 반환"""
+        url, params = self.endpoint.build_request(page)
+        if self.rate_limiter:
+            self.rate_limiter.acquire(url)
+
+        response = self.session.get(
+            url,
+            params=params,
+            timeout=self.timeout,
+            headers={'Accept': 'application/json', 'X-Requested-With': 'XMLHttpRequest'}
+        )
+        if response.status_code in (401, 403):
+            raise OrderApiError(f"로그인 세션이 유효하지 않습니다 (HTTP {response.status_code})")
+        response.raise_for_status()
+
+        try:
+            payload = response.json()
+        except ValueError:
+            # 세션이 만료되면 로그인 페이지 HTML로 리다이렉트됨
+            raise OrderApiError(f"JSON이 아닌 응답입니다: {response.headers.get('Content-Type', '')}")
+
+        if self.record_folder:
+            record_path = os.path.join(self.record_folder, f"page_{page}.json")
+            with open(record_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+        return payload
+
+    def iter_pages(self):
+        """(페이지 번호, parse_page 결과)를 마지막 페이지까지 순서대로 반환"""
+        first_page = self.endpoint.first_page
+        for page in range(first_page, first_page + self.max_pages):
+            parsed = self.endpoint.parse_page(self.fetch_page(page))
+            yield page, parsed
+            if not parsed['has_next']:
+                break
+
+class RecordedResponseHandler(BaseHTTPRequestHandler):
+    """?page=N 요청에 녹화된 page_N.json을 돌려주는 요청 처리기"""
+
+    record_folder = "."
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        page = query.get('page', ['1'])[0]
+        record_path = os.path.join(self.record_folder, f"page_{page}.json")
+
+        if not re.fullmatch(r'\d+', page) or not os.path.exists(record_path):
+            self.send_error(404)
+            return
+
+        with open(record_path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_recorded_responses(record_folder, host="127.0.0.1", port=0):
+    """녹화된 응답을 제공하는 로컬 서버를 백그라운드 스레드로 시작
+
+    반환된 서버의 server_address로 주소를 확인하고, 끝나면 shutdown()을 호출합니다.
+    """
+    handler = type('BoundRecordedResponseHandler', (RecordedResponseHandler,), {'record_folder': record_folder})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, name="recorded-order-api", daemon=True)
+    thread.start()
+    return server
+
+def main():
+    """녹화된 구매 내역 응답 재생 서버 실행"""
+    if len(sys.argv) < 3 or sys.argv[1] != "--serve":
+        print("사용법: python order_api.py --serve <녹화_폴더> [포트]")
+        return
+
+    port = int(sys.argv[3]) if len(sys.argv) > 3 else 8765
+    server = serve_recorded_responses(sys.argv[2], port=port)
+    host, port = server.server_address[:2]
+    print(f"녹화된 구매 내역 응답 제공 중: http://{host}:{port}")
+    print("crawler_config.json의 order_api_base_url을 위 주소로 지정하세요. (Ctrl+C로 종료)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
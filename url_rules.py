@@ -0,0 +1,444 @@
+# 이미지 URL 분류·정규화 규칙 (한 번 컴파일하고 URL별 결과를 캐시)
+import re
+import sys
+import time
+import random
+import threading
+
+DEFAULT_VALID_HOSTS = ('msscdn.net', 'musinsa.com')
+DEFAULT_BLOCKED_TOKENS = ('logo', 'banner', 'ad', 'icon', 'sprite')
+DEFAULT_EXTENSIONS = ('jpg', 'jpeg', 'png', 'webp')
+DEFAULT_ICON_SIZES = ('16x16', '32x32', '50x50')
+# 앞에 있는 규칙이 우선 (URL에 처음 나타나는 규칙 하나만 적용)
+DEFAULT_RESOLUTION_REWRITES = (
+    ('/thumb/', '/large/'),
+    ('/small/', '/origin/'),
+    ('_thumb', '_large'),
+    ('_small', '_origin'),
+    ('/150/', '/500/'),
+    ('/300/', '/800/'),
+    ('_150.', '_500.'),
+    ('_300.', '_800.')
+)
+# 해상도 확인 시 시도할 후보 (큰 것부터, 원래 URL은 항상 마지막 후보)
+DEFAULT_RESOLUTION_VARIANTS = (
+    ('/thumb/', ('/origin/', '/large/')),
+    ('/small/', ('/origin/', '/large/')),
+    ('_thumb', ('_origin', '_large')),
+    ('_small', ('_origin', '_large')),
+    ('/150/', ('/500/', '/300/')),
+    ('/300/', ('/800/', '/500/')),
+    ('_150.', ('_500.', '_300.')),
+    ('_300.', ('_800.', '_500.'))
+)
+
+# 같은 이미지의 크기 변형을 나타내는 경로 단어와 우선순위 (대략의 픽셀 너비, 클수록 큰 이미지)
+# 목록에 없는 숫자(_01, _2024 등)는 같은 상품의 다른 사진일 수 있으므로 크기로 보지 않음
+DEFAULT_SIZE_TOKENS = (
+    ('origin', 10000),
+    ('large', 900),
+    ('900', 900),
+    ('800', 800),
+    ('big', 600),
+    ('600', 600),
+    ('500', 500),
+    ('300', 300),
+    ('150', 150),
+    ('125', 125),
+    ('small', 110),
+    ('thumb', 90),
+    ('60', 60)
+)
+# 이미지 정체성에 영향을 주지 않는 쿼리 파라미터 (리사이즈·캐시 무효화)
+DEFAULT_VOLATILE_PARAMS = ('w', 'h', 'width', 'height', 'resize', 'size', 'q', 'quality',
+                           't', 'ts', 'v', 'ver', 'version', 'timestamp', 'cache', 'cb', '_')
+# 값이 요청 너비를 뜻하는 파라미터 (없으면 원본 크기로 간주)
+RESIZE_PARAMS = ('w', 'width', 'size', 'resize')
+
+_MISSING = object()
+
+class ImageUrlRules:
+    """상품 이미지 URL 판별과 고해상도 변환 규칙
+
+    규칙은 생성 시 정규식으로 한 번만 컴파일하고, 같은 URL은 캐시된 결과를 돌려줍니다.
+    제외 단어(logo, ad 등)는 경로의 단어 단위로만 일치하므로 '/goods/adidas' 같은 URL은 제외되지 않습니다.
+    """
+
+    def __init__(self, valid_hosts=DEFAULT_VALID_HOSTS, blocked_tokens=DEFAULT_BLOCKED_TOKENS,
+                 extensions=DEFAULT_EXTENSIONS, icon_sizes=DEFAULT_ICON_SIZES,
+                 resolution_rewrites=DEFAULT_RESOLUTION_REWRITES,
+                 resolution_variants=DEFAULT_RESOLUTION_VARIANTS, size_tokens=DEFAULT_SIZE_TOKENS,
+                 volatile_params=DEFAULT_VOLATILE_PARAMS, rewrite=True, cache_size=200000):
+        self.valid_hosts = tuple(host.lower() for host in valid_hosts)
+        self.resolution_rewrites = tuple(resolution_rewrites)
+        self.resolution_variants = dict(resolution_variants)
+        # False면 normalize가 URL을 바꾸지 않음 (다운로드 단계에서 해상도를 확인하는 경우)
+        self.rewrite = rewrite
+        self.cache_size = cache_size
+
+        # 스킴(생략 가능)·호스트·경로를 한 번에 분리
+        self.url_pattern = re.compile(r'^(?:[a-z][a-z0-9+.\-]*:)?//(?:[^/?#@]*@)?([^/?#:]+)(?::\d+)?([^?#]*)')
+        self.host_pattern = re.compile(
+            r'(?:^|\.)(?:' + '|'.join(re.escape(host) for host in self.valid_hosts) + r')$'
+        )
+        # 경로를 / _ - . 기준 단어로 보고 단어 전체가 일치할 때만 제외 (복수형·번호 허용: icons, banner2)
+        self.blocked_pattern = re.compile(
+            r'(?:^|[/_\-.])(?:' + '|'.join(map(re.escape, blocked_tokens)) + r')s?\d*(?=$|[/_\-.])'
+        )
+        self.extension_pattern = re.compile(
+            r'\.(?:' + '|'.join(map(re.escape, extensions)) + r')(?![a-z0-9])'
+        )
+        self.icon_size_pattern = re.compile(
+            r'(?<!\d)(?:' + '|'.join(map(re.escape, icon_sizes)) + r')(?!\d)'
+        )
+        # 겹치는 규칙도 모두 찾도록 전방 탐색으로 일치 위치만 확인
+        self.rewrite_pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(old) for old, _ in self.resolution_rewrites) + '))'
+        )
+        self.rewrite_priority = {old: index for index, (old, _) in enumerate(self.resolution_rewrites)}
+        # 크기 단어는 경로 폴더 전체(/thumb/, /500/)이거나 확장자 바로 앞의 '_' 접미사(_big.jpg, _125.jpg)일 때만 인정
+        self.size_rank = dict(size_tokens)
+        size_words = '(?:' + '|'.join(re.escape(token) for token, _ in size_tokens) + ')'
+        self.size_pattern = re.compile(
+            r'(?<=/)' + size_words + r'(?=/)|(?<=_)' + size_words + r'(?=\.[a-z0-9]+$)'
+        )
+        self.volatile_params = frozenset(param.lower() for param in volatile_params)
+
+        self._verdicts = {}
+        self._rewrites = {}
+        self._normalized = {}
+        self._canonical = {}
+        self.stats = {'hits': 0, 'misses': 0, 'collapsed': 0}
+
+    def is_product_image(self, url):
+        """유효한 상품 이미지 URL인지 확인 (결과 캐시)"""
+        verdict = self._verdicts.get(url)
+        if verdict is not None:
+            self.stats['hits'] += 1
+            return verdict
+
+        self.stats['misses'] += 1
+        verdict = self._classify(url)
+        if len(self._verdicts) >= self.cache_size:
+            self._verdicts.clear()
+        self._verdicts[url] = verdict
+        return verdict
+
+    def _classify(self, url):
+        if not url or url.startswith('data:'):
+            return False
+        match = self.url_pattern.match(url.lower())
+        if not match:
+            return False
+
+        # 무신사 관련 도메인 확인
+        host, path = match.groups()
+        if not self.host_pattern.search(host):
+            return False
+
+        # 불필요한 이미지 단어 제외
+        if self.blocked_pattern.search(path):
+            return False
+        # 이미지 확장자 확인
+        if not self.extension_pattern.search(path):
+            return False
+        # 작은 아이콘 크기 제외
+        if self.icon_size_pattern.search(path):
+            return False
+        return True
+
+    def to_high_resolution(self, url):
+        """고해상도 URL로 변환 (결과 캐시)"""
+        rewritten = self._rewrites.get(url)
+        if rewritten is not None:
+            return rewritten
+
+        rewritten = url
+        found = {match.group(1) for match in self.rewrite_pattern.finditer(url)}
+        if found:
+            old = min(found, key=self.rewrite_priority.get)
+            new = self.resolution_rewrites[self.rewrite_priority[old]][1]
+            rewritten = url.replace(old, new)
+
+        if len(self._rewrites) >= self.cache_size:
+            self._rewrites.clear()
+        self._rewrites[url] = rewritten
+        return rewritten
+
+    def resolution_candidates(self, url):
+        """해상도 확인용 (패턴 키, [(대체 문자열, 후보 URL), ...]) 반환
+
+        패턴 키는 호스트·첫 경로 단위·바꿀 부분으로 만들며, 같은 키의 URL은 같은 변환이 통한다고 봅니다.
+        대체 문자열이 None인 마지막 후보는 원래 URL입니다. 바꿀 부분이 없으면 (None, []) 반환.
+        """
+        found = {match.group(1) for match in self.rewrite_pattern.finditer(url)}
+        found = [token for token in found if token in self.resolution_variants]
+        if not found:
+            return None, []
+
+        token = min(found, key=self.rewrite_priority.get)
+        match = self.url_pattern.match(url.lower())
+        host, path = match.groups() if match else ('', '')
+        first_segment = path.strip('/').split('/', 1)[0]
+        key = f"{host}/{first_segment}|{token}"
+
+        candidates = [(replacement, url.replace(token, replacement))
+                      for replacement in self.resolution_variants[token]]
+        candidates.append((None, url))
+        return key, candidates
+
+    def canonical_key(self, url):
+        """크기 변형과 캐시 무효화 파라미터를 무시한 이미지 정체성 키 (결과 캐시)
+
+        예: '.../123_1_150.jpg?t=5'와 '.../123_1_500.jpg'는 같은 키 'image.msscdn.net/.../123_1_*.jpg'
+        """
+        key = self._canonical.get(url)
+        if key is not None:
+            return key
+
+        lowered = url.lower()
+        match = self.url_pattern.match(lowered)
+        if not match:
+            key = url
+        else:
+            host, path = match.groups()
+            key = host + self.size_pattern.sub('*', path)
+            query = lowered.partition('?')[2].partition('#')[0]
+            if query:
+                kept = sorted(pair for pair in query.split('&')
+                              if pair and pair.partition('=')[0] not in self.volatile_params)
+                if kept:
+                    key += '?' + '&'.join(kept)
+
+        if len(self._canonical) >= self.cache_size:
+            self._canonical.clear()
+        self._canonical[url] = key
+        return key
+
+    def variant_rank(self, url):
+        """같은 정체성의 변형끼리 비교할 순위 (클수록 좋은 변형)
+
+        경로의 크기 단어 순위 합을 먼저 보고, 같으면 리사이즈 파라미터가 없는 URL을,
+        둘 다 있으면 요청 너비가 큰 URL을 우선합니다.
+        """
+        lowered = url.lower()
+        base, _, query = lowered.partition('?')
+        size_score = sum(self.size_rank[token] for token in self.size_pattern.findall(base))
+
+        width = None
+        for pair in query.partition('#')[0].split('&'):
+            name, _, value = pair.partition('=')
+            if name in RESIZE_PARAMS:
+                digits = re.match(r'\d+', value)
+                width = max(width or 0, int(digits.group()) if digits else 0)
+        if width is None:
+            return (size_score, 1, 0)
+        return (size_score, 0, width)
+
+    def collapse_variants(self, urls):
+        """정체성별로 가장 좋은 변형 하나만 남긴 URL 목록 (처음 나온 순서 유지)"""
+        best = {}
+        collapsed = 0
+        for url in urls:
+            key = self.canonical_key(url)
+            current = best.get(key)
+            if current is None:
+                best[key] = url
+            elif current != url:
+                collapsed += 1
+                if self.variant_rank(url) > self.variant_rank(current):
+                    best[key] = url
+        self.stats['collapsed'] += collapsed
+        return list(best.values())
+
+    def normalize(self, url):
+        """유효한 상품 이미지면 고해상도 URL(rewrite=False면 원래 URL), 아니면 None (결과 캐시)"""
+        normalized = self._normalized.get(url, _MISSING)
+        if normalized is not _MISSING:
+            self.stats['hits'] += 1
+            return normalized
+
+        if not self.is_product_image(url):
+            normalized = None
+        else:
+            normalized = self.to_high_resolution(url) if self.rewrite else url
+        if len(self._normalized) >= self.cache_size:
+            self._normalized.clear()
+        self._normalized[url] = normalized
+        return normalized
+
+    def normalize_batch(self, urls):
+        """URL 목록을 판별·변환하여 중복 없이 순서대로 반환
+
+        캐시 조회를 반복문 안에서 직접 하여 URL당 함수 호출을 줄이고,
+        같은 이미지의 크기·쿼리 변형은 가장 좋은 변형 하나로 합칩니다.
+        """
+        cache = self._normalized
+        result = {}
+        hits = 0
+        for url in urls:
+            normalized = cache.get(url, _MISSING)
+            if normalized is _MISSING:
+                normalized = self.normalize(url)
+            else:
+                hits += 1
+            if normalized is not None:
+                result[normalized] = None
+        self.stats['hits'] += hits
+        return self.collapse_variants(result)
+
+class VariantIndex:
+    """이미지 정체성(canonical_key)별로 가장 좋은 URL 변형 하나만 보관
+
+    여러 페이지·추출 단계·샤드 작업자에서 모은 URL을 합칠 때 사용하며 스레드 간에 공유할 수 있습니다.
+    정체성마다 처음 발견된 (페이지, 순서)를 기억하여 최근 주문 우선 정렬에 사용합니다.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._best = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        self.stats = {'collapsed': 0, 'upgraded': 0}
+
+    def add(self, url, page=None):
+        """새 정체성이면 'new', 더 좋은 변형으로 교체하면 'upgraded', 합쳐지면 None 반환
+
+        page는 URL을 찾은 구매 내역 페이지 번호 (모르면 None, 페이지를 아는 URL보다 뒤로 정렬)
+        """
+        key = self.rules.canonical_key(url)
+        with self._lock:
+            current = self._best.get(key)
+            if current is None:
+                self._best[key] = url
+                self._positions[key] = (page if page is not None else float('inf'), len(self._positions))
+                return 'new'
+            if current == url:
+                return None
+            self.stats['collapsed'] += 1
+            if self.rules.variant_rank(url) > self.rules.variant_rank(current):
+                self._best[key] = url
+                self.stats['upgraded'] += 1
+                return 'upgraded'
+            return None
+
+    def position(self, url):
+        """정체성이 처음 발견된 (페이지, 순서) - 작을수록 최근 주문 (모르는 URL은 맨 뒤)"""
+        return self._positions.get(self.rules.canonical_key(url), (float('inf'), float('inf')))
+
+    def urls(self):
+        """정체성별 가장 좋은 URL 목록 (처음 나온 순서)"""
+        with self._lock:
+            return list(self._best.values())
+
+    def __len__(self):
+        return len(self._best)
+
+def legacy_is_valid_product_image(url):
+    """비교용: 규칙을 매번 만들고 부분 문자열로 검사하던 이전 판별 방식"""
+    if not url or url.startswith('data:'):
+        return False
+    url_lower = url.lower()
+    if not any(domain in url_lower for domain in ['msscdn.net', 'musinsa.com']):
+        return False
+    if any(pattern in url_lower for pattern in ['logo', 'banner', 'ad', 'icon', 'sprite']):
+        return False
+    if not any(ext in url_lower for ext in ['.jpg', '.jpeg', '.png', '.webp']):
+        return False
+    if any(size in url_lower for size in ['16x16', '32x32', '50x50']):
+        return False
+    return True
+
+def legacy_convert_to_high_resolution(url):
+    """비교용: 이전 고해상도 변환 방식"""
+    conversions = dict(DEFAULT_RESOLUTION_REWRITES)
+    for old, new in conversions.items():
+        if old in url:
+            return url.replace(old, new)
+    return url
+
+def build_synthetic_corpus(size=1000000, unique=50000, seed=7):
+    """벤치마크용 가짜 URL 목록 (한 페이지에서 같은 URL이 반복 수집되는 상황 재현)"""
+    rng = random.Random(seed)
+    hosts = ['https://image.msscdn.net', 'https://www.musinsa.com', 'https://static.msscdn.net',
+             'https://cdn.example.com']
+    folders = ['images/goods_img', 'images/prd_img', 'thumbnails/images/goods_img', 'mfile_s01/_banner',
+               'skin/musinsa/images', 'images/brand/adidas', 'images/goods/adidas']
+    suffixes = ['_500.jpg', '_150.jpg', '_300.png', '.webp', '_thumb.jpg', '_small.jpeg', '_icon.png',
+                '_16x16.png', '.gif', '_ad.jpg']
+    unique_urls = [
+        f"{rng.choice(hosts)}/{rng.choice(folders)}/2024{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}/"
+        f"{rng.randint(100000, 9999999)}/{rng.randint(100000, 9999999)}_{rng.randint(1, 9)}"
+        f"{rng.choice(suffixes)}" + (f"?t={rng.randint(1, 99999)}" if rng.random() < 0.3 else "")
+        for _ in range(unique)
+    ]
+    return [rng.choice(unique_urls) for _ in range(size)]
+
+def check_variant_rules():
+    """변형 통합 규칙 점검: 크기 변형은 같은 키, 다른 사진은 다른 키인지 확인 (실패 항목 목록 반환)"""
+    rules = ImageUrlRules()
+    base = 'https://image.msscdn.net/images/goods_img/20240101/123456/123456_1'
+    same = [
+        (base + '_125.jpg', base + '_500.jpg'),
+        (base + '_60.jpg', base + '_big.jpg'),
+        (base + '_500.jpg?t=5', base + '_500.jpg'),
+        ('https://image.msscdn.net/thumb/a/1.jpg', 'https://image.msscdn.net/large/a/1.jpg')
+    ]
+    different = [
+        (base + '_01.jpg', base + '_02.jpg'),
+        (base + '_2023.jpg', base + '_2024.jpg'),
+        (base + '_500_1.jpg', base + '_500_2.jpg')
+    ]
+    failures = []
+    for first, second in same:
+        if rules.canonical_key(first) != rules.canonical_key(second):
+            failures.append(f"같은 이미지로 보지 않음: {first} / {second}")
+    for first, second in different:
+        if rules.canonical_key(first) == rules.canonical_key(second):
+            failures.append(f"다른 이미지를 합침: {first} / {second}")
+    if rules.variant_rank(base + '_500.jpg') <= rules.variant_rank(base + '_125.jpg'):
+        failures.append("_500 변형이 _125 변형보다 우선하지 않음")
+    return failures
+
+def run_benchmark(size=1000000):
+    """이전 방식과 컴파일·캐시 방식의 처리 시간 비교"""
+    print(f"가짜 URL {size:,}개 생성 중...")
+    corpus = build_synthetic_corpus(size)
+
+    start = time.perf_counter()
+    legacy = [legacy_convert_to_high_resolution(url) for url in corpus if legacy_is_valid_product_image(url)]
+    legacy_seconds = time.perf_counter() - start
+
+    rules = ImageUrlRules()
+    start = time.perf_counter()
+    compiled = [rules.to_high_resolution(url) for url in corpus if rules.is_product_image(url)]
+    compiled_seconds = time.perf_counter() - start
+
+    batch_rules = ImageUrlRules()
+    start = time.perf_counter()
+    unique = batch_rules.normalize_batch(corpus)
+    batch_seconds = time.perf_counter() - start
+
+    # 변경 규칙 확인: 단어 단위 제외로 살아난 URL 수 (예: /goods/adidas/)
+    check_rules = ImageUrlRules()
+    recovered = sum(1 for url in set(corpus)
+                    if check_rules.is_product_image(url) and not legacy_is_valid_product_image(url))
+
+    print(f"이전 방식:          {legacy_seconds:.2f}초 (유효 {len(legacy):,}개)")
+    print(f"컴파일+캐시:        {compiled_seconds:.2f}초 (유효 {len(compiled):,}개, "
+          f"캐시 적중 {rules.stats['hits']:,} / 계산 {rules.stats['misses']:,})")
+    print(f"일괄 처리(중복 제거): {batch_seconds:.2f}초 (고유 {len(unique):,}개)")
+    print(f"속도 향상: 개별 호출 {legacy_seconds / compiled_seconds:.1f}배, 일괄 처리 {legacy_seconds / batch_seconds:.1f}배")
+    print(f"단어 단위 규칙으로 더 이상 제외되지 않는 고유 URL: {recovered:,}개")
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "--benchmark":
+        run_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1000000)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "--check":
+        problems = check_variant_rules()
+        for problem in problems:
+            print(problem)
+        print("변형 통합 규칙 점검: " + ("실패" if problems else "통과"))
+        sys.exit(1 if problems else 0)
+    else:
+        print("사용법: python url_rules.py --benchmark [URL 수] | --check")